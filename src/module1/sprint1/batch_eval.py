@@ -0,0 +1,123 @@
+"""
+Vectorized evaluation of many TicTacToe positions at once with NumPy. Boards are (N, n, n) int8
+arrays of X = 1, O = -1 and empty = 0, and markers on every winning line of every board are
+counted with a single matrix product
+
+This is a standalone utility for analysing many positions, like those of self-play games. The AI
+search does not use it, as search scores one position at a time with incremental line counts.
+benchmark.py compares the two on all moves of a position
+
+:author: @mjuuti
+"""
+from dataclasses import dataclass
+
+from bitboard import BitBoard, get_line_masks
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only batch evaluation needs it
+    np = None
+
+X = 1
+O = -1
+EMPTY = 0
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """
+    Evaluation of a batch of boards, one item per board
+    """
+
+    winners: 'np.ndarray'  # X, O or EMPTY when neither has a full line
+    full: 'np.ndarray'  # boolean if board has no empty cells
+    scores: 'np.ndarray'  # heuristic score, positive when O is better off
+
+
+class BatchEvaluator:
+    """
+    Evaluator for boards of given size and rules. Heuristic score counts lines still open for one
+    player only, each worth 10 to the power of the player's markers on it, O's lines positive and
+    X's negative, like the AI sees the game
+    """
+
+    grid_width = None  # type: int
+    win_length = None  # type: int
+    line_matrix = None  # type: np.ndarray
+
+    def __init__(self, grid_width: int, win_length: int = None):
+        if np is None:
+            raise ImportError('numpy is required for batch evaluation')
+        self.grid_width = grid_width
+        self.win_length = win_length or grid_width
+
+        # one row per winning line, with ones at the cells of the line
+        line_masks = get_line_masks(grid_width, self.win_length)
+        self.line_matrix = np.zeros((len(line_masks), grid_width * grid_width), dtype=np.float32)
+        for line, mask in enumerate(line_masks):
+            self.line_matrix[line, BitBoard.get_cells(mask)] = 1
+
+    def encode(self, boards: list) -> 'np.ndarray':
+        """
+        Convert boards of list of lists of markers to an array
+        :param boards: list of boards with 'X', 'O' and empty cells
+        :return: (N, n, n) int8 array
+        """
+        values = {'X': X, 'O': O}
+        return np.array([[[values.get(marker, EMPTY) for marker in row] for row in board] for board in boards],
+                        dtype=np.int8).reshape(-1, self.grid_width, self.grid_width)
+
+    def get_line_counts(self, boards: 'np.ndarray') -> tuple:
+        """
+        Count markers of both players on every line of every board
+        :param boards: (N, n, n) or (n, n) array
+        :return: tuple of (N, lines) arrays of X and O markers
+        """
+        cells = self._get_cells(boards)
+        x_counts = (cells == X).astype(np.float32) @ self.line_matrix.T
+        o_counts = (cells == O).astype(np.float32) @ self.line_matrix.T
+        return x_counts.astype(np.int8), o_counts.astype(np.int8)
+
+    def evaluate(self, boards: 'np.ndarray') -> BatchResult:
+        """
+        Get winner, full board flag and heuristic score of every board
+        :param boards: (N, n, n) or (n, n) array
+        :return: BatchResult
+        """
+        cells = self._get_cells(boards)
+        x_counts, o_counts = self.get_line_counts(cells)
+        x_won = (x_counts == self.win_length).any(axis=1)
+        o_won = (o_counts == self.win_length).any(axis=1)
+        winners = np.where(x_won, X, np.where(o_won, O, EMPTY)).astype(np.int8)
+
+        # lines blocked by the other player cannot be won, and empty lines are worth the same to both
+        o_lines = np.where(x_counts == 0, np.power(10.0, o_counts), 0.0)
+        x_lines = np.where(o_counts == 0, np.power(10.0, x_counts), 0.0)
+        scores = o_lines.sum(axis=1) - x_lines.sum(axis=1)
+        return BatchResult(winners, (cells != EMPTY).all(axis=1), scores)
+
+    def get_children(self, board: 'np.ndarray', marker: int) -> tuple:
+        """
+        Get all positions reachable with one move
+        :param board: (n, n) array
+        :param marker: X or O
+        :return: tuple(list of (x, y) tuples, (M, n, n) array of boards after each move)
+        """
+        free = np.flatnonzero(board.reshape(-1) == EMPTY)
+        children = np.repeat(board.reshape(1, -1), len(free), axis=0)
+        children[np.arange(len(free)), free] = marker
+        moves = [divmod(int(index), self.grid_width) for index in free]
+        return moves, children.reshape(-1, self.grid_width, self.grid_width)
+
+    def _get_cells(self, boards: 'np.ndarray') -> 'np.ndarray':
+        """
+        Flatten boards to one row of cells per board
+        :param boards: (N, n, n), (n, n) or (N, n * n) array
+        :return: (N, n * n) array
+        """
+        boards = np.asarray(boards)
+        if boards.shape[-1] != self.grid_width * self.grid_width:
+            if boards.shape[-2:] != (self.grid_width, self.grid_width):
+                raise ValueError(f'Boards should be {self.grid_width}x{self.grid_width}, got shape {boards.shape}')
+            boards = boards.reshape(-1, self.grid_width * self.grid_width)
+        return boards.reshape(-1, self.grid_width * self.grid_width)
@@ -0,0 +1,173 @@
+"""
+Benchmark suite for TicTacToe board primitives and AI search. Positions and random tie-breaks are
+seeded, so that results written as JSON can be compared between commits
+
+:author: @mjuuti
+"""
+import gc
+import json
+import platform
+import random
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+
+from batch_eval import BatchEvaluator, O, np
+from tictactoe import GameSettings, TicTacToe
+
+SEED = 2024
+
+
+def get_arguments(argv: list = None):
+    """
+    Command-line argument parser for benchmarks
+    :param argv: arguments to parse instead of sys.argv
+    :return:
+    """
+    parser = ArgumentParser('TicTacToe benchmarks')
+    parser.add_argument('--size', type=int, nargs='+', default=[3, 4, 5], dest='sizes', help='Game grid widths')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timing rounds for each benchmark')
+    parser.add_argument('--output', help='JSON file to write results to')
+    parser.add_argument('--compare', help='JSON file of earlier results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Allowed slowdown compared to earlier results, as a fraction')
+    return parser.parse_args(argv)
+
+
+def get_benchmark_game(grid_width: int, seed: int = SEED) -> TicTacToe:
+    """
+    Create a game in a fixed mid-game position with AI (O) in turn. Moves are random, but never
+    end the game
+    :param grid_width: width (and height) of the board
+    :param seed: random seed for the moves
+    :return: TicTacToe instance
+    """
+    rng = random.Random(seed)
+    game = TicTacToe(GameSettings(size=grid_width, quiet=True))
+    marker = 'X'
+    for _ in range(2 * grid_width - 5):
+        moves = [move for move in sorted(game.get_legal_moves()) if not game._is_winning_cell(*move, marker)]
+        game.apply_move(rng.choice(moves), marker)
+        marker = 'O' if marker == 'X' else 'X'
+    return game
+
+
+def time_function(function, number: int, repeat: int, setup=None) -> dict:
+    """
+    Time calls of a function after a warm-up round, with garbage collection disabled like in timeit
+    :param function: function without arguments
+    :param number: number of calls in a timing round
+    :param repeat: number of timing rounds
+    :param setup: function called before each round, outside of timing
+    :return: dictionary of fastest and median seconds per call
+    """
+    timings = list()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat + 1):
+            if setup is not None:
+                setup()
+            start = perf_counter()
+            for _ in range(number):
+                function()
+            timings.append((perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    timings = timings[1:]
+    return {'min': min(timings), 'median': median(timings), 'number': number, 'repeat': repeat}
+
+
+def get_children_benchmarks(game: TicTacToe) -> dict:
+    """
+    Benchmarks of scoring every position reachable with one AI move, one at a time on the board
+    like search does, and all at once with BatchEvaluator when numpy is installed. Search does not
+    use BatchEvaluator, and these show whether it would pay off at leaves
+    :param game: game with AI (O) in turn
+    :return: dictionary of benchmark name -> (function, number, setup)
+    """
+    def evaluate_children():
+        scores = list()
+        for x, y in game.get_legal_moves():
+            game._place_marker(x, y, 'O')
+            scores.append(game.evaluator.score)
+            game._remove_marker(x, y)
+        return scores
+
+    benchmarks = {'evaluate_children': (evaluate_children, 100, None)}
+    if np is not None:
+        evaluator = BatchEvaluator(game.grid_width, game.win_length)
+        board = evaluator.encode([game.marker_places])[0]
+        benchmarks['batch_evaluate_children'] = (lambda: evaluator.evaluate(evaluator.get_children(board, O)[1]),
+                                                 100, None)
+    return benchmarks
+
+
+def run_benchmarks(sizes: list, repeat: int = 5) -> dict:
+    """
+    Run all benchmarks on each board size
+    :param sizes: list of grid widths
+    :param repeat: number of timing rounds for each benchmark
+    :return: dictionary of benchmark name -> timings
+    """
+    results = dict()
+    for size in sizes:
+        game = get_benchmark_game(size)
+
+        def reset_search():
+            # same tie-breaks and no positions cached from the previous round
+            random.seed(SEED)
+            game.transposition_table.clear()
+
+        benchmarks = {
+            'check_win_condition': (game._check_win_condition_impl, 1000, None),
+            'is_table_full': (game._is_table_full, 1000, None),
+            'draw_board': (game._draw_board_impl, 1000, None),
+            'best_move': (game._get_best_move_coordinates, 1, reset_search),
+        }
+        benchmarks.update(get_children_benchmarks(game))
+        for name, (function, number, setup) in benchmarks.items():
+            results[f'{name}/{size}x{size}'] = time_function(function, number, repeat, setup)
+    return results
+
+
+def compare_results(baseline: dict, results: dict, threshold: float) -> list:
+    """
+    Find benchmarks which have become slower than allowed. Fastest timings are compared, as
+    they are least affected by other load on the machine
+    :param baseline: earlier results
+    :param results: current results
+    :param threshold: allowed slowdown as a fraction, e.g. 0.1 for 10 %
+    :return: list of tuples(name, earlier seconds, current seconds) for regressed benchmarks
+    """
+    regressions = list()
+    for name, timing in results.items():
+        if name in baseline and timing['min'] > baseline[name]['min'] * (1 + threshold):
+            regressions.append((name, baseline[name]['min'], timing['min']))
+    return regressions
+
+
+if __name__ == '__main__':
+    args = get_arguments()
+    benchmark_results = run_benchmarks(args.sizes, args.repeat)
+    for benchmark_name, benchmark_timing in benchmark_results.items():
+        print(f'{benchmark_name:<28} {1e6 * benchmark_timing["min"]:>12.1f} us '
+              f'(median {1e6 * benchmark_timing["median"]:.1f} us)')
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'python': platform.python_version(), 'platform': platform.platform(),
+                       'date': datetime.now().isoformat(timespec='seconds'), 'results': benchmark_results},
+                      output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline_results = json.load(baseline_file)['results']
+        slower = compare_results(baseline_results, benchmark_results, args.threshold)
+        for benchmark_name, before, after in slower:
+            print(f'Regression: {benchmark_name} {1e6 * before:.1f} us -> {1e6 * after:.1f} us '
+                  f'(+{after / before - 1:.0%})')
+        sys.exit(1 if slower else 0)
@@ -0,0 +1,195 @@
+"""
+Compact TicTacToe board state as two integer bitmasks, one for each player. Cell (x, y) is bit
+x * grid_width + y, so placing and removing markers and checking for a win are bitwise operations
+
+:author: @mjuuti
+"""
+
+
+def get_line_masks(grid_width: int, win_length: int = None) -> list:
+    """
+    Get bitmasks of all lines on the board which win the game when claimed by a single player
+    :param grid_width: width (and height) of the board
+    :param win_length: number of markers in a row needed to win, by default full row of grid_width
+    :return: list of integer masks; rows, columns, down and up diagonals
+    """
+    win_length = win_length or grid_width
+    masks = list()
+    for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for x in range(grid_width):
+            for y in range(grid_width):
+                end_x, end_y = x + dx * (win_length - 1), y + dy * (win_length - 1)
+                if end_x not in range(grid_width) or end_y not in range(grid_width):
+                    continue
+                masks.append(sum(1 << ((x + dx * n) * grid_width + y + dy * n) for n in range(win_length)))
+    return masks
+
+
+class BitBoard:
+    """
+    Board state for fast AI search. Markers are placed by cell index rather than coordinates
+    """
+
+    grid_width = None  # type: int
+    win_length = None  # type: int
+    x_mask = 0
+    o_mask = 0
+    full_mask = 0
+    line_masks = None  # type: list
+    cell_line_masks = None  # type: list
+    _not_first_column = 0
+    _not_last_column = 0
+
+    def __init__(self, grid_width: int, win_length: int = None):
+        self.grid_width = grid_width
+        self.win_length = win_length or grid_width
+        self.full_mask = (1 << (grid_width * grid_width)) - 1
+        self.line_masks = get_line_masks(grid_width, self.win_length)
+
+        # lines going through each cell, so that a single move can be checked for a win
+        self.cell_line_masks = [[mask for mask in self.line_masks if mask >> index & 1]
+                                for index in range(grid_width * grid_width)]
+
+        # edge columns are masked out when shifting sideways, so that rows do not wrap around
+        first_column = sum(1 << (x * grid_width) for x in range(grid_width))
+        self._not_first_column = self.full_mask & ~first_column
+        self._not_last_column = self.full_mask & ~(first_column << (grid_width - 1))
+
+    @classmethod
+    def from_marker_places(cls, marker_places: list, win_length: int = None):
+        """
+        Create bitboard from a board of list of lists of markers
+        :param marker_places: board with 'X', 'O' and empty cells
+        :param win_length: number of markers in a row needed to win
+        :return: BitBoard instance
+        """
+        board = cls(len(marker_places), win_length)
+        for x, row in enumerate(marker_places):
+            for y, marker in enumerate(row):
+                if marker in ('X', 'O'):
+                    board.place(board.get_index(x, y), marker)
+        return board
+
+    def get_index(self, x: int, y: int) -> int:
+        """
+        Get cell index of coordinates
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :return: bit index of the cell
+        """
+        return x * self.grid_width + y
+
+    def get_coordinates(self, index: int) -> tuple:
+        """
+        Get coordinates of cell index
+        :param index: bit index of the cell
+        :return: tuple(x, y)
+        """
+        return divmod(index, self.grid_width)
+
+    def get_mask(self, marker: str) -> int:
+        """
+        Get bitmask of cells claimed by the player
+        :param marker: player's marker (X or O)
+        :return: integer mask
+        """
+        return self.x_mask if marker == 'X' else self.o_mask
+
+    def place(self, index: int, marker: str):
+        """
+        Place player's marker to a cell
+        :param index: bit index of the cell
+        :param marker: player's marker (X or O)
+        :return: None
+        """
+        if marker == 'X':
+            self.x_mask |= 1 << index
+        else:
+            self.o_mask |= 1 << index
+
+    def remove(self, index: int):
+        """
+        Clear a cell
+        :param index: bit index of the cell
+        :return: None
+        """
+        self.x_mask &= ~(1 << index)
+        self.o_mask &= ~(1 << index)
+
+    def is_free(self, index: int) -> bool:
+        """
+        Check if no marker is placed in a cell
+        :param index: bit index of the cell
+        :return: boolean if cell is free
+        """
+        return not (self.x_mask | self.o_mask) >> index & 1
+
+    def is_full(self) -> bool:
+        """
+        Check if all cells have a marker
+        :return: boolean if board is full
+        """
+        return self.x_mask | self.o_mask == self.full_mask
+
+    def has_won(self, marker: str) -> bool:
+        """
+        Check if player has claimed any full line
+        :param marker: player's marker (X or O)
+        :return: boolean if player has won
+        """
+        mask = self.get_mask(marker)
+        return any(mask & line == line for line in self.line_masks)
+
+    def is_winning_move(self, index: int, marker: str) -> bool:
+        """
+        Check if placing marker in a cell would complete a line for the player
+        :param index: bit index of the cell
+        :param marker: player's marker (X or O)
+        :return: boolean if move wins the game
+        """
+        mask = self.get_mask(marker) | 1 << index
+        return any(mask & line == line for line in self.cell_line_masks[index])
+
+    def get_winner(self):
+        """
+        Get the player who has claimed a full line
+        :return: 'X', 'O' or None if neither has won
+        """
+        for marker in ('X', 'O'):
+            if self.has_won(marker):
+                return marker
+        return None
+
+    def get_free_cells(self) -> list:
+        """
+        Get indices of all cells without a marker
+        :return: list of bit indices
+        """
+        return self.get_cells(~(self.x_mask | self.o_mask) & self.full_mask)
+
+    def get_neighbourhood(self, distance: int) -> int:
+        """
+        Get free cells within given number of steps from any marker, diagonal steps included
+        :param distance: number of steps
+        :return: integer mask of cells
+        """
+        occupied = self.x_mask | self.o_mask
+        area = occupied
+        for _ in range(distance):
+            horizontal = area | (area << 1) & self._not_first_column | (area >> 1) & self._not_last_column
+            area = (horizontal | horizontal << self.grid_width | horizontal >> self.grid_width) & self.full_mask
+        return area & ~occupied
+
+    @staticmethod
+    def get_cells(mask: int) -> list:
+        """
+        Get indices of cells in a mask
+        :param mask: integer mask of cells
+        :return: list of bit indices
+        """
+        cells = list()
+        while mask:
+            lowest = mask & -mask
+            cells.append(lowest.bit_length() - 1)
+            mask ^= lowest
+        return cells
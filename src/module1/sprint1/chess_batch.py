@@ -0,0 +1,160 @@
+"""
+Non-interactive capture analysis for many chess positions. Positions are read one per line from a
+file or stdin and results are written one line each as soon as they are ready, so that input of any
+size is analyzed without reading it all to memory
+
+Position lines are either FEN, of which only the piece placement field is used, or pieces in the
+format of the interactive challenge separated by semicolons, first the white hero and then black
+pieces (e.g. "bishop d4; knight a1; rook g7"). Result lines list the black pieces white can take,
+like "a1 g7", "-" when there are none, or "ERR" and the reason for invalid lines
+
+A single process analyzes some 30 000 distinct positions a second, so larger inputs need --workers
+
+:author: @mjuuti
+"""
+import sys
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+
+from chess_bitboard import ChessBitBoard
+from chess_challenge import HORIZONTAL, PIECES, VERTICAL, ChessBoard
+
+LOCATIONS = [f'{HORIZONTAL[y]}{VERTICAL[x]}' for x in range(8) for y in range(8)]
+SQUARES = {location: square for square, location in enumerate(LOCATIONS)}
+# number of distinct positions whose results are remembered, as position files often repeat positions
+RESULT_CACHE_SIZE = 2 ** 16
+
+
+def get_arguments(argv: list = None):
+    """
+    Command-line argument parser for batch analysis
+    :param argv: arguments to parse instead of sys.argv
+    :return:
+    """
+    parser = ArgumentParser('Chess capture analysis')
+    parser.add_argument('input', nargs='?', help='File of positions, one per line (default: stdin)')
+    parser.add_argument('--output', help='File to write results to (default: stdout)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes analyzing positions')
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help='Number of lines sent to a worker process at a time')
+    return parser.parse_args(argv)
+
+
+def parse_position(line: str) -> ChessBitBoard:
+    """
+    Parse a position line
+    :param line: FEN or semicolon-separated "piece location" entries, white hero first
+    :return: ChessBitBoard instance
+    """
+    if '/' in line:
+        return ChessBitBoard.from_fen(line.split(None, 1)[0])
+
+    board = ChessBitBoard()
+    side = 'w'
+    for entry in line.split(';'):
+        piece, _, location = entry.strip().lower().partition(' ')
+        if piece not in PIECES or location.strip() not in SQUARES:
+            raise ValueError(f'Invalid piece and location: {entry.strip()}')
+        square = SQUARES[location.strip()]
+        if not board.is_free(square):
+            raise ValueError(f'Location {location.strip()} is already taken')
+        board.place(square, ChessBoard.get_piece_abbreviation(piece, side))
+        side = 'b'
+    return board
+
+
+def get_capturable(board: ChessBitBoard) -> list:
+    """
+    Get black pieces attacked by white pieces
+    :param board: ChessBitBoard instance
+    :return: list of locations, in the order of the board rows
+    """
+    capturable = board.get_attacks('w') & board.get_mask('b')
+    locations = list()
+    while capturable:
+        low_bit = capturable & -capturable
+        locations.append(LOCATIONS[low_bit.bit_length() - 1])
+        capturable ^= low_bit
+    return locations
+
+
+def analyze_lines(lines):
+    """
+    Analyze positions one line at a time
+    :param lines: iterable of position lines, like an open file
+    :return: generator of result lines, one for each input line
+    """
+    results = dict()
+    for line in lines:
+        line = line.strip()
+        result = results.get(line)
+        if result is None:
+            if not line:
+                result = '\n'
+            else:
+                try:
+                    result = f'{" ".join(get_capturable(parse_position(line))) or "-"}\n'
+                except ValueError as error:
+                    result = f'ERR {error}\n'
+            if len(results) < RESULT_CACHE_SIZE:
+                results[line] = result
+        yield result
+
+
+def analyze_chunk(lines: list) -> list:
+    """
+    Analyze a chunk of lines in a worker process
+    :param lines: list of position lines
+    :return: list of result lines
+    """
+    return list(analyze_lines(lines))
+
+
+def analyze_parallel(lines, executor: Executor, workers: int, chunk_size: int = 10000):
+    """
+    Analyze positions in worker processes, keeping the results in input order. Only a few chunks
+    per worker are read ahead, so that memory use does not grow with the input
+    :param lines: iterable of position lines, like an open file
+    :param executor: process pool
+    :param workers: number of processes in the pool
+    :param chunk_size: number of lines sent to a worker process at a time
+    :return: generator of result lines, one for each input line
+    """
+    lines = iter(lines)
+    pending = deque()
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if chunk:
+            pending.append(executor.submit(analyze_chunk, chunk))
+        while pending and (not chunk or len(pending) > 2 * workers):
+            yield from pending.popleft().result()
+        if not chunk:
+            return
+
+
+def main(argv: list = None):
+    """
+    Analyze positions from input file or stdin to output file or stdout
+    :param argv: arguments to parse instead of sys.argv
+    :return: None
+    """
+    args = get_arguments(argv)
+    input_file = open(args.input) if args.input else sys.stdin
+    output_file = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.workers > 1:
+            with ProcessPoolExecutor(args.workers) as executor:
+                output_file.writelines(analyze_parallel(input_file, executor, args.workers, args.chunk_size))
+        else:
+            output_file.writelines(analyze_lines(input_file))
+    finally:
+        if args.input:
+            input_file.close()
+        if args.output:
+            output_file.close()
+
+
+if __name__ == '__main__':
+    main()
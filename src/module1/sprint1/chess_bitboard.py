@@ -0,0 +1,291 @@
+"""
+Bitboard representation of a chess board. Every piece type of both sides is a 64-bit integer with
+a bit set for each square it occupies, square index being x * 8 + y with x = 0 on rank 8 and
+y = 0 on file a. Attack tables of every square are built once at import by shifting masks, and
+sliding pieces' rays are cut at their first blocker with a single bit scan
+
+:author: @mjuuti
+"""
+
+FULL = (1 << 64) - 1
+KNIGHT_STEPS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_STEPS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ROOK_DIRECTIONS = ((-1, 0), (0, -1), (0, 1), (1, 0))
+# pawns capture diagonally forward, white towards rank 8 and black towards rank 1
+PAWN_STEPS = {'w': ((-1, -1), (-1, 1)), 'b': ((1, -1), (1, 1))}
+SLIDE_DIRECTIONS = {
+    'bishop': BISHOP_DIRECTIONS,
+    'rook': ROOK_DIRECTIONS,
+    'queen': BISHOP_DIRECTIONS + ROOK_DIRECTIONS,
+}
+# piece letter of abbreviations like 'bH', and the side and abbreviation of FEN piece letters
+ABBREVIATION_PIECES = {'P': 'pawn', 'H': 'knight', 'B': 'bishop', 'R': 'rook', 'Q': 'queen', 'K': 'king'}
+FEN_PIECES = {'P': 'wP', 'N': 'wH', 'B': 'wB', 'R': 'wR', 'Q': 'wQ', 'K': 'wK',
+              'p': 'bP', 'n': 'bH', 'b': 'bB', 'r': 'bR', 'q': 'bQ', 'k': 'bK'}
+FEN_LETTERS = {abbreviation: letter for letter, abbreviation in FEN_PIECES.items()}
+
+
+def get_square(x: int, y: int) -> int:
+    """
+    Get index of a square, used as bit position in masks
+    :param x: x-coordinate (row)
+    :param y: y-coordinate (column)
+    :return: integer between 0 and 63
+    """
+    return x * 8 + y
+
+
+def get_squares(mask: int) -> list:
+    """
+    Get coordinates of squares set in a mask
+    :param mask: integer with a bit set for each square
+    :return: list of (x, y) tuples, in the order of the board rows
+    """
+    squares = list()
+    while mask:
+        low_bit = mask & -mask
+        squares.append(divmod(low_bit.bit_length() - 1, 8))
+        mask ^= low_bit
+    return squares
+
+
+def _get_column_mask(columns: range) -> int:
+    """
+    Get mask of all squares on given columns
+    :param columns: range of y-coordinates
+    :return: 64-bit mask
+    """
+    mask = 0
+    for x in range(8):
+        for y in columns:
+            mask |= 1 << (x * 8 + y)
+    return mask
+
+
+# squares a shift by dy columns can land on without wrapping around to the next row
+_SHIFT_MASKS = {dy: _get_column_mask(range(max(dy, 0), 8 + min(dy, 0))) for dy in range(-2, 3)}
+
+
+def shift(mask: int, dx: int, dy: int) -> int:
+    """
+    Move all squares of a mask by given number of rows and columns, dropping squares moved off the board
+    :param mask: 64-bit mask
+    :param dx: rows to move, positive towards rank 1
+    :param dy: columns to move, positive towards file h
+    :return: 64-bit mask
+    """
+    offset = dx * 8 + dy
+    mask = (mask << offset if offset > 0 else mask >> -offset) & FULL
+    return mask & _SHIFT_MASKS[dy]
+
+
+def get_step_attacks(mask: int, steps: tuple) -> int:
+    """
+    Get squares attacked by pieces moving a single step, like knights and kings
+    :param mask: squares of the pieces
+    :param steps: (dx, dy) tuples of the piece's moves
+    :return: 64-bit mask
+    """
+    attacks = 0
+    for dx, dy in steps:
+        attacks |= shift(mask, dx, dy)
+    return attacks
+
+
+def get_slide_attacks(mask: int, occupied: int, directions: tuple) -> int:
+    """
+    Get squares attacked by sliding pieces, like bishops. A ray ends at the first occupied square,
+    which is attacked itself
+    :param mask: squares of the pieces
+    :param occupied: squares of all pieces on the board
+    :param directions: (dx, dy) tuples of the piece's directions
+    :return: 64-bit mask
+    """
+    attacks = 0
+    for dx, dy in directions:
+        ray = shift(mask, dx, dy)
+        while ray:
+            attacks |= ray
+            ray = shift(ray & ~occupied, dx, dy)
+    return attacks
+
+
+KNIGHT_ATTACKS = [get_step_attacks(1 << square, KNIGHT_STEPS) for square in range(64)]
+KING_ATTACKS = [get_step_attacks(1 << square, KING_STEPS) for square in range(64)]
+PAWN_ATTACKS = {side: [get_step_attacks(1 << square, steps) for square in range(64)]
+                for side, steps in PAWN_STEPS.items()}
+# attacks from each square of pieces moving a single step, by abbreviation
+STEP_ATTACKS = {
+    'wH': KNIGHT_ATTACKS, 'bH': KNIGHT_ATTACKS,
+    'wK': KING_ATTACKS, 'bK': KING_ATTACKS,
+    'wP': PAWN_ATTACKS['w'], 'bP': PAWN_ATTACKS['b'],
+}
+# rays from each square on an empty board for each direction, and if squares grow along the ray
+RAYS = {(dx, dy): ([get_slide_attacks(1 << square, 0, ((dx, dy),)) for square in range(64)], dx * 8 + dy > 0)
+        for dx, dy in BISHOP_DIRECTIONS + ROOK_DIRECTIONS}
+SLIDE_RAYS = {piece: [RAYS[direction] for direction in directions] for piece, directions in SLIDE_DIRECTIONS.items()}
+
+
+def get_ray_attacks(square: int, occupied: int, rays: list) -> int:
+    """
+    Get squares attacked by a sliding piece. Each ray ends at its first piece, which is attacked itself
+    :param square: square index of the piece
+    :param occupied: squares of all pieces on the board
+    :param rays: (ray table, growing) tuples of the piece's directions, like SLIDE_RAYS['bishop']
+    :return: 64-bit mask
+    """
+    attacks = 0
+    for ray_table, growing in rays:
+        ray = ray_table[square]
+        blockers = ray & occupied
+        if blockers:
+            # nearest blocker is the lowest square on rays towards rank 1 or file h, else the highest
+            first = (blockers & -blockers).bit_length() - 1 if growing else blockers.bit_length() - 1
+            # squares beyond the blocker are on its own ray in the same direction
+            ray ^= ray_table[first]
+        attacks |= ray
+    return attacks
+
+
+def _parse_fen_rank(rank: str) -> tuple:
+    """
+    Parse one rank of FEN piece placement
+    :param rank: rank like '2p3Nk'
+    :return: tuple of (abbreviation, mask of squares on the first row) tuples
+    """
+    pieces = dict()
+    square = 0
+    for letter in rank:
+        if letter in FEN_PIECES:
+            abbreviation = FEN_PIECES[letter]
+            pieces[abbreviation] = pieces.get(abbreviation, 0) | 1 << square
+            square += 1
+        elif letter in '12345678':
+            square += int(letter)
+        else:
+            raise ValueError(f'Invalid FEN piece: {letter}')
+    if square != 8:
+        raise ValueError(f'FEN rank should have 8 squares: {rank}')
+    return tuple(pieces.items())
+
+
+class ChessBitBoard:
+    """
+    Occupancy of a chess board as one mask for each piece abbreviation, like 'bB' for a black
+    bishop, and one for all pieces
+    """
+
+    pieces = None  # type: dict
+    occupied = 0
+    # parsed FEN ranks, as the same ranks keep repeating in files of positions
+    _fen_ranks = dict()
+    _fen_rank_limit = 2 ** 14
+
+    def __init__(self):
+        self.pieces = dict()
+
+    @classmethod
+    def from_fen(cls, placement: str) -> 'ChessBitBoard':
+        """
+        Create board from the piece placement field of FEN, like 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+        :param placement: ranks from 8 to 1 separated by slashes, digits for runs of empty squares
+        :return: ChessBitBoard instance
+        """
+        board = cls()
+        pieces = board.pieces
+        ranks = placement.split('/')
+        if len(ranks) != 8:
+            raise ValueError(f'FEN placement should have 8 ranks: {placement}')
+        fen_ranks = cls._fen_ranks
+        occupied = 0
+        for x, rank in enumerate(ranks):
+            rank_pieces = fen_ranks.get(rank)
+            if rank_pieces is None:
+                rank_pieces = _parse_fen_rank(rank)
+                if len(fen_ranks) < cls._fen_rank_limit:
+                    fen_ranks[rank] = rank_pieces
+            for abbreviation, mask in rank_pieces:
+                mask <<= x * 8
+                pieces[abbreviation] = pieces.get(abbreviation, 0) | mask
+                occupied |= mask
+        board.occupied = occupied
+        return board
+
+    def place(self, square: int, abbreviation: str):
+        """
+        Place a piece on the board
+        :param square: square index
+        :param abbreviation: side and piece, like 'wH'
+        :return: None
+        """
+        self.pieces[abbreviation] = self.pieces.get(abbreviation, 0) | 1 << square
+        self.occupied |= 1 << square
+
+    def remove(self, square: int, abbreviation: str):
+        """
+        Remove a piece from the board
+        :param square: square index
+        :param abbreviation: side and piece of the removed piece
+        :return: None
+        """
+        self.pieces[abbreviation] &= ~(1 << square)
+        self.occupied &= ~(1 << square)
+
+    def get_mask(self, prefix: str = '') -> int:
+        """
+        Get squares of pieces with abbreviation starting with prefix
+        :param prefix: typically side 'w' or 'b', or empty for all pieces
+        :return: 64-bit mask
+        """
+        if not prefix:
+            return self.occupied
+        mask = 0
+        for abbreviation, piece_mask in self.pieces.items():
+            if abbreviation.startswith(prefix):
+                mask |= piece_mask
+        return mask
+
+    def count(self, prefix: str = '') -> int:
+        """
+        Count pieces with abbreviation starting with prefix
+        :param prefix: typically side 'w' or 'b', or empty for all pieces
+        :return: number of pieces
+        """
+        return self.get_mask(prefix).bit_count()
+
+    def get_attacks(self, side: str) -> int:
+        """
+        Get all squares attacked by pieces of a side, every piece type at once
+        :param side: 'w' or 'b'
+        :return: 64-bit mask
+        """
+        attacks = 0
+        for abbreviation, mask in self.pieces.items():
+            if abbreviation[0] != side:
+                continue
+            while mask:
+                low_bit = mask & -mask
+                attacks |= self.get_piece_attacks(low_bit.bit_length() - 1, abbreviation)
+                mask ^= low_bit
+        return attacks
+
+    def get_piece_attacks(self, square: int, abbreviation: str) -> int:
+        """
+        Get squares attacked by a piece, up to and including the first piece in each direction
+        :param square: square index of the piece
+        :param abbreviation: side and piece, like 'wH'
+        :return: 64-bit mask
+        """
+        table = STEP_ATTACKS.get(abbreviation)
+        if table is not None:
+            return table[square]
+        return get_ray_attacks(square, self.occupied, SLIDE_RAYS[ABBREVIATION_PIECES[abbreviation[1]]])
+
+    def is_free(self, square: int) -> bool:
+        """
+        Check if no piece is on a square
+        :param square: square index
+        :return: boolean
+        """
+        return not self.occupied >> square & 1
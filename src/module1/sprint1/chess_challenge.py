@@ -3,9 +3,10 @@ Turing College DS M1, S1 Chess challenge
 
 :author: @mjuuti
 """
-import math
 import random
 
+from chess_bitboard import FEN_LETTERS, ChessBitBoard, get_square, get_squares
+
 EMPTY = '  '
 VERTICAL = '87654321'
 HORIZONTAL = 'abcdefgh'
@@ -14,8 +15,10 @@ PIECES = {
     'king': 'king',
     'knight': 'horse',  # set alias to horse so we could actually use king as well
     'pawn': 'pawn',
+    'rook': 'rook',
+    'queen': 'queen',
 }
-ALLOWED_PIECES = ['knight', 'bishop']
+ALLOWED_PIECES = list(PIECES)
 
 
 def printf(message: str):
@@ -30,18 +33,81 @@ def printf(message: str):
     print(border)
 
 
+class BoardRow(list):
+    """
+    Row of the string board, which keeps the bitboard up to date whenever a square is set
+    """
+
+    bitboard = None  # type: ChessBitBoard
+    x = None  # type: int
+
+    def __init__(self, bitboard: ChessBitBoard, x: int, cells: list = None):
+        super().__init__(cells or [EMPTY] * 8)
+        self.bitboard = bitboard
+        self.x = x
+
+    def __setitem__(self, y: int, abbreviation: str):
+        square = get_square(self.x, y)
+        if self[y] != EMPTY:
+            self.bitboard.remove(square, self[y])
+        if abbreviation != EMPTY:
+            self.bitboard.place(square, abbreviation)
+        super().__setitem__(y, abbreviation)
+
+
 class ChessBoard:
     """
-    Class for chess, holding data of pieces on the board
+    Class for chess, holding data of pieces on the board. Pieces are kept both as abbreviations on
+    a list of lists for printing, and on a bitboard for counting pieces and finding captures
     """
 
     board = None  # type: list
+    bitboard = None  # type: ChessBitBoard
     white_coordinates = None  # type: tuple
     white_type = None  # type: str
 
     def __init__(self):
         self.initialize_board()
 
+    @classmethod
+    def from_fen(cls, fen: str) -> 'ChessBoard':
+        """
+        Create board from FEN, like '4k3/8/8/3q4/8/8/8/3R4 w - - 0 1'. Only piece placement is used,
+        and it must have a single white piece, which becomes our hero
+        :param fen: FEN string, or just its piece placement field
+        :return: ChessBoard instance
+        """
+        bitboard = ChessBitBoard.from_fen(fen.split(None, 1)[0])
+        white_pieces = get_squares(bitboard.get_mask('w'))
+        if len(white_pieces) != 1:
+            raise ValueError(f'FEN should have exactly one white piece, found {len(white_pieces)}')
+        x, y = white_pieces[0]
+        chess = cls()
+        chess.set_bitboard(bitboard)
+        chess.white_coordinates = (x, y)
+        chess.white_type = chess.get_side_and_piece_from_abbreviation(chess.board[x][y])[1]
+        return chess
+
+    def to_fen(self) -> str:
+        """
+        Get board as FEN, with white to move and no castling, en passant or move counts
+        :return: FEN string
+        """
+        ranks = list()
+        for row in self.board:
+            rank = ''
+            empty = 0
+            for abbreviation in row:
+                if abbreviation == EMPTY:
+                    empty += 1
+                    continue
+                if abbreviation not in FEN_LETTERS:
+                    raise ValueError(f'Piece {abbreviation} has no FEN letter')
+                rank += f'{empty or ""}{FEN_LETTERS[abbreviation]}'
+                empty = 0
+            ranks.append(rank + f'{empty or ""}')
+        return f'{"/".join(ranks)} w - - 0 1'
+
     def main(self):
         """
         Main method run by module if run directly
@@ -111,11 +177,7 @@ class ChessBoard:
         Getter for black pieces in hero piece's range
         :return: list of coordinates
         """
-        in_range = list()
-        for x, y in self.get_pieces('b'):
-            if self.is_valid_move(x, y):
-                in_range.append((x, y))
-        return in_range
+        return get_squares(self.get_attacks() & self.bitboard.get_mask('b'))
 
     def show_pieces_white_can_take(self):
         """
@@ -152,18 +214,21 @@ class ChessBoard:
                 self.board[x][y] = EMPTY
         self.print_board()
 
+    def get_attacks(self) -> int:
+        """
+        Get squares our hero piece attacks, up to and including the first piece in each direction
+        :return: 64-bit mask
+        """
+        x, y = self.white_coordinates
+        return self.bitboard.get_piece_attacks(get_square(x, y), self.board[x][y])
+
     def get_pieces(self, prefix: str = "b"):
         """
         Get coordinates of all pieces on the board
         :param prefix: show only if abbreviation is prefixed with this string, typically 'w' or 'b'
         :return: List of coordinates
         """
-        coordinates = list()
-        for x in range(8):
-            for y in range(8):
-                if self.board[x][y].startswith(prefix):
-                    coordinates.append((x, y))
-        return coordinates
+        return get_squares(self.bitboard.get_mask(prefix))
 
     def get_piece_count(self, prefix: str = '') -> int:
         """
@@ -171,18 +236,27 @@ class ChessBoard:
         :param prefix: Filter to include pieces with abbreviation prefix only
         :return: Number of pieces mathing the filter
         """
-        temp = list()
-        [temp.extend(loc) for loc in self.board]
-        return len([loc for loc in temp if loc.strip().startswith(prefix)])
+        return self.bitboard.count(prefix)
 
     def initialize_board(self):
         """
         Set up new fresh board
         :return:
         """
-        self.board = list()
-        for _ in range(8):
-            self.board.append([EMPTY] * 8)
+        self.set_bitboard(ChessBitBoard())
+
+    def set_bitboard(self, bitboard: ChessBitBoard):
+        """
+        Use a bitboard with pieces already on it, and fill the board rows from it
+        :param bitboard: ChessBitBoard instance
+        :return: None
+        """
+        rows = [[EMPTY] * 8 for _ in range(8)]
+        for abbreviation, mask in bitboard.pieces.items():
+            for x, y in get_squares(mask):
+                rows[x][y] = abbreviation
+        self.bitboard = bitboard
+        self.board = [BoardRow(bitboard, x, row) for x, row in enumerate(rows)]
 
     def is_valid_input(self, user_input: str) -> bool:
         """
@@ -259,17 +333,6 @@ class ChessBoard:
                   f'like "{random.choice(ALLOWED_PIECES)} a4".')
             return False, False
 
-    @staticmethod
-    def get_distance(start: tuple, end: tuple) -> float:
-        """
-        Get Pythagorean distance between two coordinates
-        :param start: tuple(x,y)
-        :param end: tuple(x,y)
-        :return: distance as float
-        """
-        return math.sqrt(math.pow(abs(start[0] - end[0]), 2) +
-                         math.pow(abs(start[1] - end[1]), 2))
-
     def is_valid_move(self, x: int, y: int):
         """
         Is move to given coordinates valid move for our hero piece, including obstacles
@@ -277,34 +340,7 @@ class ChessBoard:
         :param y: y-coordinate
         :return: boolean if hero can reach this destination following chess rules
         """
-        if self.white_type == 'knight':
-            if abs(self.white_coordinates[0] - x) > 2 or abs(self.white_coordinates[1] - y) > 2:
-                return False
-
-            if self.get_distance(self.white_coordinates, (x, y)) != math.sqrt(5):
-                return False
-
-            return True
-
-        if self.white_type == 'king':
-            return self.get_distance(self.white_coordinates, (x, y)) <= math.sqrt(2)
-
-        if self.white_type == 'bishop':
-            wx, wy = self.white_coordinates  # makes code a bit more readable
-            if abs(x - wx) != abs(y - wy):
-                return False
-
-            # Check if route to the target is obstructed by any other piece
-            xc = -1 if x - wx < 0 else 1
-            yc = -1 if y - wy < 0 else 1
-            tx, ty = wx, wy  # temp location coordinates
-            while True:
-                tx += xc
-                ty += yc
-                if (tx, ty) == (x, y):
-                    return True
-                if self.board[tx][ty] != EMPTY:
-                    return False
+        return bool(self.get_attacks() >> get_square(x, y) & 1)
 
     @staticmethod
     def is_valid_location(location: str):
@@ -327,7 +363,7 @@ class ChessBoard:
         :param y:
         :return: True if no piece is on given coordinates
         """
-        return self.board[x][y] == EMPTY
+        return self.bitboard.is_free(get_square(x, y))
 
     def get_coordinates_from_location(self, location: str):
         """
@@ -347,7 +383,7 @@ class ChessBoard:
         :param y:
         :return: string representing chess location like a5 or f8
         """
-        return f'{HORIZONTAL[x]}{VERTICAL[y]}'
+        return f'{HORIZONTAL[y]}{VERTICAL[x]}'
 
     def print_board(self):
         """
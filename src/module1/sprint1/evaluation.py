@@ -0,0 +1,120 @@
+"""
+Static evaluation of unfinished TicTacToe positions, used where depth-limited search stops before
+the end of the game. Evaluators follow every marker placed and removed during search, so that the
+score of a position is ready without looking at the whole board
+
+:author: @mjuuti
+"""
+
+# evaluations stay below the smallest win score (100 / depth on a 15x15 board), so that a win
+# is always preferred over any unfinished position
+HEURISTIC_LIMIT = 0.25
+
+
+class Evaluator:
+    """
+    Base class for evaluators. Score is from the AI's (O) point of view, between -HEURISTIC_LIMIT
+    and HEURISTIC_LIMIT
+    """
+
+    score = 0.0
+
+    def reset(self, marker_places: list):
+        """
+        Start following a new position
+        :param marker_places: board as list of lists of markers
+        :return: None
+        """
+        self.score = 0.0
+
+    def place(self, x: int, y: int, marker: str):
+        """
+        Update evaluation for a placed marker
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker (X or O)
+        :return: None
+        """
+
+    def remove(self, x: int, y: int, marker: str):
+        """
+        Update evaluation for a removed marker
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker which was in the cell
+        :return: None
+        """
+
+
+class LineEvaluator(Evaluator):
+    """
+    Lines still open for a single player are worth 10 to the power of the player's markers on the
+    line, O's lines positive and X's negative. Line values are kept up to date move by move, and
+    their sum is scaled below HEURISTIC_LIMIT
+    """
+
+    lines = None  # type: list
+    scale = 1.0
+    _cell_lines = None  # type: dict
+    _counts = None  # type: dict
+    _total = 0
+
+    def __init__(self, lines: list, win_length: int):
+        self.lines = lines
+        # one nearly complete line moves the score half way to the limit
+        self.scale = 10.0 ** (win_length - 1)
+        self._cell_lines = dict()
+        for index, line in enumerate(lines):
+            for cell in line:
+                self._cell_lines.setdefault(cell, list()).append(index)
+        self._counts = {'X': [0] * len(lines), 'O': [0] * len(lines)}
+
+    def reset(self, marker_places: list):
+        for counts in self._counts.values():
+            counts[:] = [0] * len(counts)
+        self._total = 0
+        for x, row in enumerate(marker_places):
+            for y, marker in enumerate(row):
+                if marker in self._counts:
+                    self.place(x, y, marker)
+
+    def place(self, x: int, y: int, marker: str):
+        own, other = self._counts[marker], self._counts['X' if marker == 'O' else 'O']
+        sign = 1 if marker == 'O' else -1
+        for index in self._cell_lines[(x, y)]:
+            count = own[index]
+            if not other[index]:
+                # line was open for the player only, or empty
+                self._total += sign * (10 ** (count + 1) - (10 ** count if count else 0))
+            elif not count:
+                # player blocks a line open for the opponent
+                self._total += sign * 10 ** other[index]
+            own[index] = count + 1
+        self.score = HEURISTIC_LIMIT * self._total / (abs(self._total) + self.scale)
+
+    def remove(self, x: int, y: int, marker: str):
+        own, other = self._counts[marker], self._counts['X' if marker == 'O' else 'O']
+        sign = 1 if marker == 'O' else -1
+        for index in self._cell_lines[(x, y)]:
+            count = own[index] - 1
+            own[index] = count
+            if not other[index]:
+                self._total -= sign * (10 ** (count + 1) - (10 ** count if count else 0))
+            elif not count:
+                self._total -= sign * 10 ** other[index]
+        self.score = HEURISTIC_LIMIT * self._total / (abs(self._total) + self.scale)
+
+
+def get_evaluator(name: str, lines: list, win_length: int):
+    """
+    Create evaluator by name
+    :param name: 'lines' or 'none'
+    :param lines: winning lines of the board as tuples of (x, y) coordinates
+    :param win_length: number of markers in a row needed to win
+    :return: Evaluator instance, or None for no evaluation
+    """
+    if name == 'lines':
+        return LineEvaluator(lines, win_length)
+    if name == 'none':
+        return None
+    raise ValueError(f'Unknown evaluator: {name}')
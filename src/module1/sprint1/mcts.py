@@ -0,0 +1,198 @@
+"""
+Monte Carlo tree search AI for TicTacToe boards too large for minimax. Moves are scored by random
+playouts on a bitboard, and the search tree is kept between turns so earlier playouts are reused
+
+:author: @mjuuti
+"""
+import random
+from math import log, sqrt
+from time import perf_counter
+
+from bitboard import BitBoard
+
+
+class SearchNode:
+    """
+    Position in the search tree, reached by a move of the given player
+    """
+
+    # slots keep the tree small, as a node is created for every playout
+    __slots__ = ('move', 'marker', 'parent', 'children', 'untried', 'visits', 'wins', 'winner')
+
+    def __init__(self, move: int, marker: str, parent, untried: list, winner: str = None):
+        self.move = move
+        self.marker = marker
+        self.parent = parent
+        self.children = dict()
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.winner = winner
+
+    def is_terminal(self) -> bool:
+        """
+        Check if game has ended in the position, with a win or a full board
+        :return: boolean if no moves can be played
+        """
+        return self.winner is not None or not (self.untried or self.children)
+
+
+class MonteCarloTreeSearch:
+    """
+    UCT search: each playout walks down the tree choosing the child with the best upper confidence
+    bound, adds one new position, plays random moves to the end of the game and updates the win
+    rates on the way back up. Only cells near markers are added to the tree, while playouts use
+    the whole board
+    """
+
+    playouts = 1000
+    think_ms = None  # type: int
+    exploration = 1.4
+    neighbourhood = 2
+    nodes_visited = 0
+    root = None  # type: SearchNode
+    _root_masks = None  # type: tuple
+
+    def __init__(self, playouts: int = None, think_ms: int = None):
+        if playouts or not think_ms:
+            self.playouts = playouts or self.playouts
+        else:
+            self.playouts = None
+        self.think_ms = think_ms
+
+    def get_move(self, board: BitBoard, marker: str) -> int:
+        """
+        Get move for the player in turn, within playout and time budget
+        :param board: current position, left unchanged
+        :param marker: player's marker (X or O)
+        :return: bit index of the cell to play
+        """
+        opponent = 'X' if marker == 'O' else 'O'
+        self.nodes_visited = 0
+        free_cells = board.get_free_cells()
+        if not board.x_mask | board.o_mask:
+            center = board.grid_width // 2
+            return board.get_index(center, center)
+
+        for player in (marker, opponent):
+            for index in free_cells:
+                if board.is_winning_move(index, player):
+                    # own win, or the opponent's win which must be blocked
+                    return index
+
+        root = self._get_root(board, opponent)
+        deadline = perf_counter() + self.think_ms / 1000 if self.think_ms else None
+        x_mask, o_mask = board.x_mask, board.o_mask
+        while self.playouts is None or self.nodes_visited < self.playouts:
+            if deadline is not None and self.nodes_visited and perf_counter() > deadline:
+                break
+            self.nodes_visited += 1
+            self._run_playout(board, root)
+            board.x_mask, board.o_mask = x_mask, o_mask
+
+        return max(root.children.values(), key=lambda child: child.visits).move
+
+    def _get_root(self, board: BitBoard, last_marker: str) -> SearchNode:
+        """
+        Find the current position in the tree kept from the previous turn, or start a new tree
+        :param board: current position
+        :param last_marker: marker of the player who made the last move
+        :return: root node of the search
+        """
+        node = self.root
+        if node is not None and self._root_masks[0] == (board.grid_width, board.win_length):
+            _, root_x, root_o = self._root_masks
+            new_cells = {'X': board.x_mask & ~root_x, 'O': board.o_mask & ~root_o}
+            if root_x & ~board.x_mask or root_o & ~board.o_mask:
+                node = None
+            while node is not None and (new_cells['X'] or new_cells['O']):
+                marker = 'X' if node.marker == 'O' else 'O'
+                node = next((child for move, child in node.children.items()
+                             if new_cells[marker] >> move & 1), None)
+                if node is not None:
+                    new_cells[marker] &= ~(1 << node.move)
+        else:
+            node = None
+
+        if node is None or node.marker != last_marker:
+            node = SearchNode(None, last_marker, None, self._get_candidates(board))
+        node.parent = None
+        self.root = node
+        self._root_masks = ((board.grid_width, board.win_length), board.x_mask, board.o_mask)
+        return node
+
+    def _get_candidates(self, board: BitBoard) -> list:
+        """
+        Get moves to add to the tree in random order
+        :param board: position
+        :return: list of bit indices
+        """
+        cells = board.get_cells(board.get_neighbourhood(self.neighbourhood))
+        random.shuffle(cells)
+        return cells
+
+    def _run_playout(self, board: BitBoard, root: SearchNode):
+        """
+        Select, expand, simulate and update the tree once. Leaves markers on the board
+        :param board: position of the root node
+        :param root: root node
+        :return: None
+        """
+        node = root
+        while not node.untried and node.children and node.winner is None:
+            node = self._select_child(node)
+            board.place(node.move, node.marker)
+
+        if node.untried and node.winner is None:
+            move = node.untried.pop()
+            marker = 'X' if node.marker == 'O' else 'O'
+            won = board.is_winning_move(move, marker)
+            board.place(move, marker)
+            child = SearchNode(move, marker, node, list() if won else self._get_candidates(board),
+                               marker if won else None)
+            node.children[move] = child
+            node = child
+
+        if node.is_terminal():
+            winner = node.winner
+        else:
+            winner = self._simulate(board, 'X' if node.marker == 'O' else 'O')
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.marker:
+                node.wins += 1
+            elif winner is None:
+                node.wins += 0.5
+            node = node.parent
+
+    def _select_child(self, node: SearchNode) -> SearchNode:
+        """
+        Get child with best upper confidence bound of win rate for the player in turn
+        :param node: fully expanded node
+        :return: child node
+        """
+        scale = self.exploration * sqrt(log(node.visits))
+        return max(node.children.values(),
+                   key=lambda child: child.wins / child.visits + scale / sqrt(child.visits))
+
+    @staticmethod
+    def _simulate(board: BitBoard, marker: str):
+        """
+        Play random moves until the game ends
+        :param board: position to play from, left unchanged
+        :param marker: marker of the player in turn
+        :return: winning marker, or None for a draw
+        """
+        cells = board.get_free_cells()
+        random.shuffle(cells)
+        masks = {'X': board.x_mask, 'O': board.o_mask}
+        cell_lines = board.cell_line_masks
+        for index in cells:
+            mask = masks[marker] | 1 << index
+            masks[marker] = mask
+            for line in cell_lines[index]:
+                if mask & line == line:
+                    return marker
+            marker = 'X' if marker == 'O' else 'O'
+        return None
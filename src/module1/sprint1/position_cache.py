@@ -0,0 +1,171 @@
+"""
+Persistent cache of AI moves, shared between games and processes. Moves are stored to an SQLite
+database keyed by the rules and search settings and the canonical form of the position, so that
+rotated and mirrored positions share an entry and a fleet of game processes warms up only once
+
+:author: @mjuuti
+"""
+import sqlite3
+from argparse import ArgumentParser
+from time import time
+from typing import Callable
+
+from transposition import get_symmetries
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS moves (
+    rules TEXT NOT NULL,
+    position TEXT NOT NULL,
+    move INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (rules, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS moves_used ON moves (used);
+"""
+
+
+def get_arguments():
+    """
+    Command-line argument parser for inspecting a cache file
+    :return:
+    """
+    parser = ArgumentParser('TicTacToe position cache')
+    parser.add_argument('path', help='Cache file given to tictactoe.py with --cache')
+    parser.add_argument('--clear', action='store_true', help='Remove all cached moves')
+    return parser.parse_args()
+
+
+class PositionCache:
+    """
+    SQLite database of best moves. Write-ahead logging lets any number of processes read while one
+    writes, and writers wait for each other up to the timeout. Least recently used moves are
+    removed when the cache grows over its maximum size
+    """
+
+    path = None  # type: str
+    max_size = None  # type: int
+    # source of the times moves are last used at, only their order matters
+    clock = None  # type: Callable[[], float]
+    # number of stores between size checks, as counting rows reads the whole index
+    prune_interval = 64
+    _connection = None  # type: sqlite3.Connection
+    _symmetries = None  # type: dict
+    _stores = 0
+
+    def __init__(self, path: str, max_size: int = 10 ** 5, timeout: float = 5.0, clock: Callable = time):
+        self.path = path
+        self.max_size = max_size
+        self.clock = clock
+        self._symmetries = dict()
+        # autocommit mode, every statement is a transaction of its own
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM moves').fetchone()[0]
+
+    def close(self):
+        """
+        Close the database connection
+        :return: None
+        """
+        self._connection.close()
+
+    def clear(self):
+        """
+        Remove all cached moves, for all rules
+        :return: None
+        """
+        self._connection.execute('DELETE FROM moves')
+
+    def get_rule_counts(self) -> list:
+        """
+        Get number of cached moves for each rules and search settings
+        :return: list of (rules, count) tuples
+        """
+        return self._connection.execute('SELECT rules, COUNT(*) FROM moves GROUP BY rules ORDER BY rules') \
+            .fetchall()
+
+    def get_position(self, marker_places: list) -> tuple:
+        """
+        Get canonical form of a position, shared by all its rotations and mirror images
+        :param marker_places: board as list of lists of markers
+        :return: tuple(position as string of cells, symmetry index it was taken with)
+        """
+        grid_width = len(marker_places)
+        if grid_width not in self._symmetries:
+            self._symmetries[grid_width] = get_symmetries(grid_width)
+        cells = [marker if marker in ('X', 'O') else '.' for row in marker_places for marker in row]
+        positions = list()
+        for permutation in self._symmetries[grid_width]:
+            image = [''] * len(cells)
+            for index, target in enumerate(permutation):
+                image[target] = cells[index]
+            positions.append(''.join(image))
+        position = min(positions)
+        return position, positions.index(position)
+
+    def lookup(self, rules: str, marker_places: list):
+        """
+        Get cached move for a position
+        :param rules: rules and search settings the move was searched with
+        :param marker_places: board as list of lists of markers
+        :return: (x, y) tuple or None if position is not cached
+        """
+        position, symmetry = self.get_position(marker_places)
+        try:
+            row = self._connection.execute('SELECT move FROM moves WHERE rules = ? AND position = ?',
+                                           (rules, position)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE moves SET used = ? WHERE rules = ? AND position = ?',
+                                     (self.clock(), rules, position))
+        except sqlite3.OperationalError:
+            # cache locked by other processes for longer than the timeout counts as a miss
+            return None
+        grid_width = len(marker_places)
+        # index of the move on the canonical board, mapped back to this board
+        return divmod(self._symmetries[grid_width][symmetry].index(row[0]), grid_width)
+
+    def store(self, rules: str, marker_places: list, move: tuple):
+        """
+        Store best move of a position
+        :param rules: rules and search settings the move was searched with
+        :param marker_places: board as list of lists of markers
+        :param move: (x, y) tuple
+        :return: None
+        """
+        position, symmetry = self.get_position(marker_places)
+        grid_width = len(marker_places)
+        canonical_move = self._symmetries[grid_width][symmetry][move[0] * grid_width + move[1]]
+        try:
+            self._connection.execute('INSERT OR REPLACE INTO moves VALUES (?, ?, ?, ?)',
+                                     (rules, position, canonical_move, self.clock()))
+            if self._stores % self.prune_interval == 0:
+                self._prune()
+        except sqlite3.OperationalError:
+            # move is searched again next time, which is better than failing the game
+            return
+        self._stores += 1
+
+    def _prune(self):
+        """
+        Remove least recently used moves over the maximum size
+        :return: None
+        """
+        excess = len(self) - self.max_size
+        if excess > 0:
+            self._connection.execute('DELETE FROM moves WHERE (rules, position) IN '
+                                     '(SELECT rules, position FROM moves ORDER BY used LIMIT ?)', (excess,))
+
+
+if __name__ == '__main__':
+    args = get_arguments()
+    cache = PositionCache(args.path)
+    if args.clear:
+        cache.clear()
+    for rules, count in cache.get_rule_counts():
+        print(f'{count:8d}  {rules}')
+    cache.close()
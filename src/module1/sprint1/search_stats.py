@@ -0,0 +1,96 @@
+"""
+Statistics of a single AI search, collected only when asked for so that search stays fast otherwise
+
+:author: @mjuuti
+"""
+
+
+class SearchStats:
+    """
+    Counters of minimax and alpha-beta search: positions visited on each depth, positions scored
+    without searching deeper, branches pruned and transposition table use, and time spent on each
+    iteration of iterative deepening
+    """
+
+    nodes_by_depth = None  # type: dict
+    terminal_evaluations = 0
+    cutoffs = 0
+    cache_probes = 0
+    cache_hits = 0
+    cache_cutoffs = 0
+    iteration_times = None  # type: dict
+    elapsed = 0.0
+
+    def __init__(self):
+        self.nodes_by_depth = dict()
+        self.iteration_times = dict()
+
+    def __str__(self):
+        lines = [f'Search: {self.nodes} positions in {self.elapsed:.3f}s, '
+                 f'{self.terminal_evaluations} scored at game end or depth limit, {self.cutoffs} cutoffs',
+                 f'Cache: {self.cache_hits}/{self.cache_probes} hits ({self.cache_hit_rate:.1%}), '
+                 f'{self.cache_cutoffs} used without search']
+        lines.extend(f'  depth {depth}: {nodes} positions' for depth, nodes in sorted(self.nodes_by_depth.items()))
+        lines.extend(f'  iteration {depth}: {seconds:.3f}s' for depth, seconds in sorted(self.iteration_times.items()))
+        return '\n'.join(lines)
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_by_depth.values())
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.cache_probes if self.cache_probes else 0.0
+
+    def add_node(self, depth: int, terminal: bool):
+        """
+        Count a visited position
+        :param depth: depth of the position
+        :param terminal: boolean if position was scored without searching deeper
+        :return: None
+        """
+        self.nodes_by_depth[depth] = self.nodes_by_depth.get(depth, 0) + 1
+        if terminal:
+            self.terminal_evaluations += 1
+
+    def add_cache_probe(self, hit: bool):
+        """
+        Count a transposition table lookup
+        :param hit: boolean if position was found
+        :return: None
+        """
+        self.cache_probes += 1
+        if hit:
+            self.cache_hits += 1
+
+    def merge(self, other: 'SearchStats'):
+        """
+        Add counters of another search, such as one run in a worker process
+        :param other: SearchStats instance
+        :return: None
+        """
+        for depth, nodes in other.nodes_by_depth.items():
+            self.nodes_by_depth[depth] = self.nodes_by_depth.get(depth, 0) + nodes
+        self.terminal_evaluations += other.terminal_evaluations
+        self.cutoffs += other.cutoffs
+        self.cache_probes += other.cache_probes
+        self.cache_hits += other.cache_hits
+        self.cache_cutoffs += other.cache_cutoffs
+
+    def as_dict(self) -> dict:
+        """
+        Get statistics as plain data, e.g. for JSON output
+        :return: dictionary of counters
+        """
+        return {
+            'nodes': self.nodes,
+            'nodes_by_depth': dict(sorted(self.nodes_by_depth.items())),
+            'terminal_evaluations': self.terminal_evaluations,
+            'cutoffs': self.cutoffs,
+            'cache_probes': self.cache_probes,
+            'cache_hits': self.cache_hits,
+            'cache_hit_rate': self.cache_hit_rate,
+            'cache_cutoffs': self.cache_cutoffs,
+            'iteration_times': dict(sorted(self.iteration_times.items())),
+            'elapsed': self.elapsed,
+        }
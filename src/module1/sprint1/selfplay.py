@@ -0,0 +1,137 @@
+"""
+Headless self-play tournaments for measuring AI strength and speed. Games are played through the
+TicTacToe engine API across a process pool, and results are reported per board size and AI mode
+
+:author: @mjuuti
+"""
+import os
+import random
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from time import perf_counter
+
+from tictactoe import GameSettings, TicTacToe
+
+
+def get_arguments(argv: list = None):
+    """
+    Command-line argument parser for self-play tournaments
+    :param argv: arguments to parse instead of sys.argv
+    :return:
+    """
+    parser = ArgumentParser('TicTacToe self-play')
+    parser.add_argument('--games', type=int, default=100, help='Number of games for each board size and AI mode')
+    parser.add_argument('--size', type=int, nargs='+', default=[3], dest='sizes', help='Game grid widths')
+    parser.add_argument('--win-length', type=int,
+                        help='Markers in a row needed to win on boards wider than it (default: grid width)')
+    parser.add_argument('--search', nargs='+', default=['alphabeta'], dest='modes',
+                        choices=['alphabeta', 'minimax', 'threat', 'mcts'], help='AI search algorithms')
+    parser.add_argument('--opponent', choices=['ai', 'random'], default='random',
+                        help='Player X: the same AI or random moves. AI always plays O')
+    parser.add_argument('--depth', type=int, default=6, dest='max_depth',
+                        help='Maximum search depth of minimax and alpha-beta search')
+    parser.add_argument('--think-ms', type=int,
+                        help='Time budget for an AI move in milliseconds, not used by minimax search')
+    parser.add_argument('--playouts', type=int, help='Number of random games Monte Carlo tree search plays per AI move')
+    parser.add_argument('--board', choices=['list', 'bitboard'], default='list', dest='board_backend',
+                        help='Board state representation used for win checks and AI search')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Number of processes playing games')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the first game')
+    return parser.parse_args(argv)
+
+
+def play_game(settings: GameSettings, opponent: str, seed: int) -> tuple:
+    """
+    Play a single game to the end. Each AI player has an engine of its own, so that cached
+    positions stay valid for one side
+    :param settings: game settings of the AI players
+    :param opponent: 'ai' or 'random' for player X
+    :param seed: random seed for the game
+    :return: tuple(result, list of AI move durations in seconds, number of positions searched)
+    """
+    random.seed(seed)
+    engines = {'O': TicTacToe(settings)}
+    if opponent == 'ai':
+        engines['X'] = TicTacToe(settings)
+
+    game = engines['O']
+    durations = list()
+    nodes = 0
+    marker = 'X'
+    while game.get_result() is None:
+        engine = engines.get(marker)
+        if engine is None:
+            move = random.choice(game.get_legal_moves())
+        else:
+            search_start = perf_counter()
+            move = engine.get_ai_move(marker)
+            durations.append(perf_counter() - search_start)
+            nodes += engine.nodes_visited
+        for engine in engines.values():
+            engine.apply_move(move, marker)
+        marker = 'O' if marker == 'X' else 'X'
+    return game.get_result(), durations, nodes
+
+
+def get_statistics(results: list, elapsed: float) -> dict:
+    """
+    Summarize results of played games
+    :param results: list of play_game results
+    :param elapsed: wall-clock seconds all games took
+    :return: dictionary of statistics
+    """
+    durations = sorted(duration for _, game_durations, _ in results for duration in game_durations)
+    thinking_time = sum(durations)
+    games = len(results)
+    return {
+        'games': games,
+        'games_per_sec': games / elapsed if elapsed else 0.0,
+        'nodes_per_sec': sum(nodes for _, _, nodes in results) / thinking_time if thinking_time else 0.0,
+        'mean_latency_ms': 1000 * thinking_time / len(durations) if durations else 0.0,
+        'p95_latency_ms': 1000 * durations[min(len(durations) - 1, int(0.95 * len(durations)))] if durations else 0.0,
+        'x_win_rate': sum(result == 'X' for result, _, _ in results) / games,
+        'o_win_rate': sum(result == 'O' for result, _, _ in results) / games,
+        'draw_rate': sum(result == 'draw' for result, _, _ in results) / games,
+    }
+
+
+def run_tournament(settings: GameSettings, opponent: str, games: int, seed: int = 0,
+                   executor: ProcessPoolExecutor = None, chunk_size: int = 1) -> dict:
+    """
+    Play games with the same settings, in worker processes when an executor is given
+    :param settings: game settings of the AI players
+    :param opponent: 'ai' or 'random' for player X
+    :param games: number of games
+    :param seed: random seed of the first game, following games use the next seeds
+    :param executor: process pool, or None to play in this process
+    :param chunk_size: number of games sent to a worker process at a time
+    :return: dictionary of statistics
+    """
+    seeds = range(seed, seed + games)
+    start = perf_counter()
+    if executor is None:
+        results = [play_game(settings, opponent, game_seed) for game_seed in seeds]
+    else:
+        results = list(executor.map(play_game, [settings] * games, [opponent] * games, seeds,
+                                    chunksize=chunk_size))
+    return get_statistics(results, perf_counter() - start)
+
+
+if __name__ == '__main__':
+    args = get_arguments()
+    base_settings = GameSettings(max_depth=args.max_depth, think_ms=args.think_ms, playouts=args.playouts,
+                                 board_backend=args.board_backend, quiet=True)
+    print(f'{"size":>4} {"mode":>9} {"games":>6} {"games/s":>9} {"nodes/s":>10} {"mean ms":>8} '
+          f'{"p95 ms":>8} {"X wins":>7} {"O wins":>7} {"draws":>7}')
+    with ProcessPoolExecutor(args.processes) as pool:
+        for size in args.sizes:
+            for mode in args.modes:
+                win_length = args.win_length if args.win_length and args.win_length < size else None
+                game_settings = replace(base_settings, size=size, win_length=win_length, search=mode)
+                stats = run_tournament(game_settings, args.opponent, args.games, args.seed, pool,
+                                       max(1, args.games // (4 * args.processes)))
+                print(f'{size:>4} {mode:>9} {stats["games"]:>6} {stats["games_per_sec"]:>9.1f} '
+                      f'{stats["nodes_per_sec"]:>10.0f} {stats["mean_latency_ms"]:>8.2f} '
+                      f'{stats["p95_latency_ms"]:>8.2f} {stats["x_win_rate"]:>7.1%} '
+                      f'{stats["o_win_rate"]:>7.1%} {stats["draw_rate"]:>7.1%}')
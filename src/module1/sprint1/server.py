@@ -0,0 +1,318 @@
+"""
+Asyncio game server hosting many TicTacToe games in one process. Every connection gets a game
+session of its own, played with a simple line protocol, and AI searches run in a process pool so
+that a slow search does not hold up other sessions. Each session is pinned to one worker process,
+which keeps the session's game between moves, so the transposition table and MCTS tree of earlier
+searches are reused and only the moves played are sent to the worker
+
+Protocol, one command per line:
+    NEW [options]   start a new game, options as on the command-line (e.g. NEW --size 5 --search mcts)
+    MOVE x,y        place marker of the player in turn, AI answers when playing against it
+    BOARD           show the board
+    QUIT            close the connection
+Every reply ends with a line starting with OK or ERR. Lines before it are board lines, AI moves
+(AI x,y) and the result when the game ends (RESULT X, RESULT O or RESULT draw)
+
+:author: @mjuuti
+"""
+import asyncio
+import multiprocessing
+import os
+from argparse import ArgumentParser
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import replace
+from itertools import count
+
+from tictactoe import GameSettings, TicTacToe
+
+
+def get_arguments(argv: list = None):
+    """
+    Command-line argument parser for the game server
+    :param argv: arguments to parse instead of sys.argv
+    :return:
+    """
+    parser = ArgumentParser('TicTacToe server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=7878, help='TCP port to listen on')
+    parser.add_argument('--unix', help='Unix socket path to listen on instead of TCP')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of processes running AI searches')
+    parser.add_argument('--cache', help='SQLite file of AI moves shared by all sessions and worker processes')
+    parser.add_argument('--book', help='Tablebase file made with tablebase.py, used by all sessions of its size')
+    return parser.parse_args(argv)
+
+
+class SearchPool:
+    """
+    Worker processes for AI searches, one single-process pool each so that every search of a
+    session runs in the same process. Workers are started from a fork server, as forking the
+    multi-threaded server process itself could deadlock
+    """
+
+    executors = None  # type: list
+
+    def __init__(self, workers: int):
+        context = multiprocessing.get_context('forkserver')
+        self.executors = [ProcessPoolExecutor(1, mp_context=context) for _ in range(max(workers, 1))]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def get_executor(self, session_id: int) -> Executor:
+        """
+        Get the worker process of a session
+        :param session_id: GameSession.session_id
+        :return: ProcessPoolExecutor instance
+        """
+        return self.executors[session_id % len(self.executors)]
+
+    def shutdown(self):
+        """
+        Stop all worker processes
+        :return: None
+        """
+        for executor in self.executors:
+            executor.shutdown()
+
+
+# games of the sessions pinned to this worker process, as (game, moves applied to it) by session id
+_games = dict()
+
+
+def _search_ai_move(session_id: int, settings: GameSettings, moves: tuple, marker: str) -> tuple:
+    """
+    Get AI move in a worker process, on the worker's own copy of the session's game. The copy is
+    kept between moves along with its search state, and only the moves played since are applied
+    :param session_id: GameSession.session_id
+    :param settings: settings of the session's game
+    :param moves: ((x, y), marker) tuples of all moves played in the game
+    :param marker: marker of the AI player
+    :return: (x, y) tuple
+    """
+    game, played = _games.get(session_id, (None, ()))
+    if game is None or game.settings != settings or moves[:len(played)] != played:
+        if game is not None:
+            game.close()
+        game, played = TicTacToe(settings), ()
+    for coordinates, move_marker in moves[len(played):]:
+        game.apply_move(coordinates, move_marker)
+    _games[session_id] = (game, moves)
+    return tuple(game.get_ai_move(marker))
+
+
+def _forget_game(session_id: int):
+    """
+    Release the worker's copy of a session's game when the session ends
+    :param session_id: GameSession.session_id
+    :return: None
+    """
+    game, _ = _games.pop(session_id, (None, ()))
+    if game is not None:
+        game.close()
+
+
+class GameSession:
+    """
+    Game of a single connection. Player X is always the one connected, and player O is the AI
+    unless the game has two players
+    """
+
+    game = None  # type: TicTacToe
+    marker = 'X'
+    moves = None  # type: list
+    pool = None  # type: SearchPool
+    cache = None  # type: str
+    book = None  # type: str
+    session_id = None  # type: int
+    _session_ids = count()
+
+    def __init__(self, pool: SearchPool = None, cache: str = None, book: str = None):
+        self.pool = pool
+        self.cache = cache
+        self.book = book
+        self.session_id = next(self._session_ids)
+        self.new_game(list())
+
+    def new_game(self, argv: list) -> list:
+        """
+        Start a new game
+        :param argv: command-line style game options
+        :return: reply lines
+        """
+        try:
+            settings = GameSettings.from_arguments(argv)
+            if settings.book:
+                return ['ERR --book is a server option']
+            # searches run in the server's pool, nothing is printed to the server's console, and
+            # clients do not get to choose files the server opens
+            settings = replace(settings, quiet=True, workers=1, stats=False, trace=None, cache=self.cache,
+                               cache_size=GameSettings.cache_size, book=self.book)
+            game = TicTacToe(settings)
+        except SystemExit:
+            return [f'ERR invalid options: {" ".join(argv)}']
+        except (ValueError, OSError) as error:
+            return [f'ERR {error}']
+        if self.game is not None:
+            self.game.close()
+        self.game = game
+        self.marker = 'X'
+        self.moves = list()
+        return [self.game._draw_board_impl(), f'OK new {game.grid_width}x{game.grid_width} game, X in turn']
+
+    async def handle_command(self, line: str) -> list:
+        """
+        Run a protocol command
+        :param line: command line from the client
+        :return: reply lines
+        """
+        command, _, argument = line.strip().partition(' ')
+        command = command.upper()
+        if command == 'NEW':
+            return self.new_game(argument.split())
+        if command == 'BOARD':
+            return [self.game._draw_board_impl(), f'OK {self.marker} in turn']
+        if command == 'MOVE':
+            return await self.move(argument)
+        return [f'ERR unknown command: {command}']
+
+    async def move(self, argument: str) -> list:
+        """
+        Play move of the connected player, and AI reply if the game is against the AI
+        :param argument: coordinates as "x,y"
+        :return: reply lines
+        """
+        try:
+            coordinates = [int(coordinate) for coordinate in argument.split(',')]
+            if len(coordinates) != 2:
+                raise ValueError
+        except ValueError:
+            return ['ERR enter move as comma-separated numbers like "1,1"']
+        try:
+            self.game.apply_move(coordinates, self.marker)
+        except ValueError as error:
+            return [f'ERR {error}']
+        self.moves.append((tuple(coordinates), self.marker))
+
+        lines = list()
+        self.marker = 'O' if self.marker == 'X' else 'X'
+        if self.game.players == 1 and self.game.get_result() is None:
+            move = await self.get_ai_move()
+            self.game.apply_move(move, self.marker)
+            self.moves.append((move, self.marker))
+            lines.append(f'AI {move[0]},{move[1]}')
+            self.marker = 'X'
+
+        lines.append(self.game._draw_board_impl())
+        if self.game.get_result() is not None:
+            lines.append(f'RESULT {self.game.get_result()}')
+            return lines + ['OK game over']
+        return lines + [f'OK {self.marker} in turn']
+
+    async def get_ai_move(self) -> tuple:
+        """
+        Run AI search in the session's worker process, without blocking other sessions
+        :return: (x, y) tuple
+        """
+        if self.pool is None:
+            return tuple(self.game.get_ai_move(self.marker))
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool.get_executor(self.session_id), _search_ai_move, self.session_id, self.game.settings,
+            tuple(self.moves), self.marker)
+
+    def close(self):
+        """
+        Close the game, and release its copy in the worker process
+        :return: None
+        """
+        self.game.close()
+        if self.pool is not None:
+            try:
+                self.pool.get_executor(self.session_id).submit(_forget_game, self.session_id)
+            except RuntimeError:
+                # pool already shut down along with the server, and the copy with it
+                pass
+
+
+class GameServer:
+    """
+    Server accepting connections and running a game session for each
+    """
+
+    pool = None  # type: SearchPool
+    cache = None  # type: str
+    book = None  # type: str
+    sessions = 0
+
+    def __init__(self, pool: SearchPool = None, cache: str = None, book: str = None):
+        self.pool = pool
+        self.cache = cache
+        self.book = book
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve a single client until it quits or disconnects
+        :param reader: stream of the client's lines
+        :param writer: stream to the client
+        :return: None
+        """
+        self.sessions += 1
+        session = GameSession(self.pool, self.cache, self.book)
+        try:
+            await self._send(writer, ['OK TicTacToe server, commands: NEW [options], MOVE x,y, BOARD, QUIT'])
+            while True:
+                line = await reader.readline()
+                if not line or line.strip().upper() == b'QUIT':
+                    break
+                await self._send(writer, await session.handle_command(line.decode(errors='replace')))
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            session.close()
+            writer.close()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, unix_path: str = None) -> asyncio.AbstractServer:
+        """
+        Start listening for connections
+        :param host: address to listen on
+        :param port: TCP port, 0 for any free port
+        :param unix_path: Unix socket path to listen on instead of TCP
+        :return: asyncio server
+        """
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, lines: list):
+        """
+        Send reply lines to the client
+        :param writer: stream to the client
+        :param lines: list of strings, possibly with line breaks
+        :return: None
+        """
+        writer.write(('\n'.join(lines) + '\n').encode())
+        await writer.drain()
+
+
+async def serve(args):
+    """
+    Run the server until interrupted
+    :param args: parsed command-line arguments
+    :return: None
+    """
+    with SearchPool(args.workers) as pool:
+        server = await GameServer(pool, args.cache, args.book).start(args.host, args.port, args.unix)
+        print(f'Serving on {args.unix or f"{args.host}:{args.port}"}')
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve(get_arguments()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,162 @@
+"""
+Perfect-play tablebase for small TicTacToe boards. All positions reachable from the empty board
+are solved once and written to a binary file of (canonical position hash -> best move, score)
+slots, which the game reads memory-mapped so that finding a move is a single hash lookup
+
+:author: @mjuuti
+"""
+import mmap
+import struct
+from argparse import ArgumentParser
+from math import inf
+
+from bitboard import BitBoard
+from transposition import ZobristHasher
+
+MAGIC = b'TTTB'
+HEADER = struct.Struct('<4sBBxxQ')  # magic, grid width, win length, number of slots
+SLOT = struct.Struct('<QBb')  # canonical hash, best move cell index, score
+EMPTY_SCORE = -128  # score marking an unused slot
+WIN_SCORE = 100  # score of a win, minus number of moves needed to reach it
+
+
+def get_arguments():
+    """
+    Command-line argument parser for tablebase generator
+    :return:
+    """
+    parser = ArgumentParser('TicTacToe tablebase')
+    parser.add_argument('--size', type=int, help='Game grid width', default=3)
+    parser.add_argument('--win-length', type=int, help='Markers in a row needed to win (default: grid width)')
+    parser.add_argument('--output', help='Tablebase file to write', required=True)
+    return parser.parse_args()
+
+
+class TableBaseGenerator:
+    """
+    Solver for all positions of a board with negamax search. Positions are keyed by canonical hash,
+    so each group of rotated and mirrored positions is solved only once
+    """
+
+    board = None  # type: BitBoard
+    hasher = None  # type: ZobristHasher
+    positions = None  # type: dict
+
+    def __init__(self, grid_width: int, win_length: int = None):
+        self.board = BitBoard(grid_width, win_length)
+        self.hasher = ZobristHasher(grid_width)
+        self.positions = dict()
+
+    def solve(self) -> dict:
+        """
+        Solve all positions reachable from the empty board
+        :return: dictionary of canonical hash -> (best move cell index on canonical board, score)
+        """
+        self._solve_position([0] * len(self.hasher.symmetries), 'X', 'O')
+        return self.positions
+
+    def _solve_position(self, board_hashes: list, marker: str, opponent: str) -> int:
+        """
+        Get score of a position for the player in turn, solving and storing it when not known yet
+        :param board_hashes: hashes of the position for each board symmetry
+        :param marker: marker of the player in turn
+        :param opponent: marker of the other player
+        :return: WIN_SCORE minus moves to win, 0 for draw or negative of that for a loss
+        """
+        board_hash, symmetry = self.hasher.get_canonical(board_hashes)
+        if board_hash in self.positions:
+            return self.positions[board_hash][1]
+
+        best_score, best_move = -inf, None
+        for index in self.board.get_free_cells():
+            self.board.place(index, marker)
+            if self.board.is_winning_move(index, marker):
+                score = WIN_SCORE - 1
+            elif self.board.is_full():
+                score = 0
+            else:
+                keys = self.hasher.get_keys(*self.board.get_coordinates(index), marker)
+                child_hashes = [child_hash ^ key for child_hash, key in zip(board_hashes, keys)]
+                child_score = self._solve_position(child_hashes, opponent, marker)
+                # result for the opponent is the reverse for us, one move further away
+                score = -child_score + (child_score > 0) - (child_score < 0)
+            self.board.remove(index)
+            if score > best_score:
+                best_score, best_move = score, index
+
+        canonical_move = self.hasher.transform_move(self.board.get_coordinates(best_move), symmetry)
+        self.positions[board_hash] = (self.board.get_index(*canonical_move), best_score)
+        return best_score
+
+    def write(self, path: str):
+        """
+        Write solved positions to an open addressing hash table file
+        :param path: file path
+        :return: None
+        """
+        slot_count = 1
+        while slot_count < 2 * len(self.positions):
+            slot_count *= 2
+
+        slots = [None] * slot_count
+        for board_hash, entry in self.positions.items():
+            slot = board_hash & (slot_count - 1)
+            while slots[slot] is not None:
+                slot = (slot + 1) & (slot_count - 1)
+            slots[slot] = (board_hash, *entry)
+
+        with open(path, 'wb') as table_file:
+            table_file.write(HEADER.pack(MAGIC, self.board.grid_width, self.board.win_length, slot_count))
+            for slot in slots:
+                table_file.write(SLOT.pack(*slot) if slot is not None else SLOT.pack(0, 0, EMPTY_SCORE))
+
+
+class TableBase:
+    """
+    Read-only tablebase file, memory-mapped so that only the slots looked up are read from disk
+    """
+
+    grid_width = None  # type: int
+    win_length = None  # type: int
+    hasher = None  # type: ZobristHasher
+    _slot_count = 0
+    _data = None  # type: mmap.mmap
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as table_file:
+            self._data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.grid_width, self.win_length, self._slot_count = HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a TicTacToe tablebase file')
+        self.hasher = ZobristHasher(self.grid_width)
+
+    def close(self):
+        """
+        Release the memory-mapped file
+        :return: None
+        """
+        self._data.close()
+
+    def lookup(self, marker_places: list):
+        """
+        Get perfect-play move and score for the player in turn
+        :param marker_places: board as list of lists of markers
+        :return: tuple((x, y), score) or None if position is not in the table
+        """
+        board_hash, symmetry = self.hasher.get_canonical(self.hasher.get_hashes(marker_places))
+        slot = board_hash & (self._slot_count - 1)
+        while True:
+            slot_hash, move, score = SLOT.unpack_from(self._data, HEADER.size + slot * SLOT.size)
+            if score == EMPTY_SCORE:
+                return None
+            if slot_hash == board_hash:
+                return self.hasher.restore_move(divmod(move, self.grid_width), symmetry), score
+            slot = (slot + 1) & (self._slot_count - 1)
+
+
+if __name__ == '__main__':
+    args = get_arguments()
+    generator = TableBaseGenerator(args.size, args.win_length)
+    positions = generator.solve()
+    generator.write(args.output)
+    print(f'{len(positions)} positions written to {args.output}')
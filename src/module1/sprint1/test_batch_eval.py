@@ -0,0 +1,70 @@
+"""
+Unit tests for vectorized batch evaluation
+"""
+__author__ = "Markus Juuti"
+
+
+import random
+from batch_eval import BatchEvaluator, O, X, np
+from bitboard import BitBoard
+from unittest import TestCase, skipIf
+
+
+@skipIf(np is None, 'numpy is not installed')
+class BatchEvalUnit(TestCase):
+
+    evaluator = None  # type: BatchEvaluator
+
+    def setUp(self):
+        self.evaluator = BatchEvaluator(3)
+
+    def test_encode(self):
+        boards = self.evaluator.encode([[['X', ' ', 'O'], [' '] * 3, [' '] * 3]])
+        assert boards.shape == (1, 3, 3) and boards.dtype == np.int8
+        assert boards[0, 0].tolist() == [X, 0, O]
+
+    def test_winners_and_full(self):
+        boards = self.evaluator.encode([
+            [['X', 'X', 'X'], ['O', 'O', ' '], [' ', ' ', ' ']],
+            [['O', 'X', 'X'], ['X', 'O', ' '], [' ', ' ', 'O']],
+            [['X', 'O', 'X'], ['X', 'O', 'O'], ['O', 'X', 'X']],
+        ])
+        result = self.evaluator.evaluate(boards)
+        assert result.winners.tolist() == [X, O, 0]
+        assert result.full.tolist() == [False, False, True]
+
+    def test_matches_bitboard(self):
+        rng = random.Random(1)
+        evaluator = BatchEvaluator(7, 4)
+        boards = np.array([rng.choice([X, O, 0]) for _ in range(200 * 49)], dtype=np.int8).reshape(200, 7, 7)
+        winners = evaluator.evaluate(boards).winners
+        for board, winner in zip(boards, winners):
+            bitboard = BitBoard(7, 4)
+            for index, value in enumerate(board.reshape(-1)):
+                if value:
+                    bitboard.place(index, 'X' if value == X else 'O')
+            if bitboard.has_won('X'):
+                assert winner == X
+            else:
+                assert winner == (O if bitboard.has_won('O') else 0)
+
+    def test_heuristic_scores(self):
+        boards = self.evaluator.encode([
+            [[' '] * 3, [' ', 'O', ' '], [' '] * 3],
+            [[' '] * 3, [' ', 'X', ' '], [' '] * 3],
+            [['X', ' ', ' '], [' ', 'O', ' '], [' '] * 3],
+        ])
+        scores = self.evaluator.evaluate(boards).scores
+        assert scores[0] > 0 and scores[0] == -scores[1], 'Center should be equally good for both players'
+        assert 0 < scores[2] < scores[0]
+
+    def test_children(self):
+        board = self.evaluator.encode([[['X', ' ', 'O'], ['X', 'O', ' '], [' ', ' ', ' ']]])[0]
+        moves, children = self.evaluator.get_children(board, X)
+        assert len(moves) == 5 and children.shape == (5, 3, 3)
+        winners = self.evaluator.evaluate(children).winners
+        assert [move for move, winner in zip(moves, winners) if winner == X] == [(2, 0)]
+        assert (board != 0).sum() == 4, 'Original board should not change'
+
+    def test_wrong_board_size(self):
+        self.assertRaises(ValueError, self.evaluator.evaluate, np.zeros((2, 4, 4), dtype=np.int8))
@@ -0,0 +1,46 @@
+"""
+Unit tests for benchmark suite
+"""
+__author__ = "Markus Juuti"
+
+
+from batch_eval import np
+from benchmark import compare_results, get_benchmark_game, get_children_benchmarks, run_benchmarks, time_function
+from unittest import TestCase
+
+
+class BenchmarkUnit(TestCase):
+
+    def test_benchmark_game_fixed_position(self):
+        first = get_benchmark_game(5)
+        second = get_benchmark_game(5)
+        assert first.marker_places == second.marker_places
+        assert first.get_result() is None and len(first.get_legal_moves()) == 20, 'O should be in turn'
+
+    def test_time_function(self):
+        calls = list()
+        timing = time_function(lambda: calls.append(1), 10, 3, lambda: calls.clear())
+        assert len(calls) == 10, 'Setup should run before each round'
+        assert timing['number'] == 10 and timing['repeat'] == 3
+        assert 0 <= timing['min'] <= timing['median']
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks([3], repeat=1)
+        expected = ['best_move/3x3', 'check_win_condition/3x3', 'draw_board/3x3', 'evaluate_children/3x3',
+                    'is_table_full/3x3']
+        if np is not None:
+            expected.insert(0, 'batch_evaluate_children/3x3')
+        assert sorted(results) == expected
+
+    def test_children_benchmarks_score_same_moves(self):
+        game = get_benchmark_game(5)
+        benchmarks = get_children_benchmarks(game)
+        scores = benchmarks['evaluate_children'][0]()
+        assert len(scores) == 20 and game.marker_places == get_benchmark_game(5).marker_places
+        if np is not None:
+            assert len(benchmarks['batch_evaluate_children'][0]().scores) == 20
+
+    def test_compare_results(self):
+        baseline = {'fast': {'min': 1.0}, 'slow': {'min': 1.0}, 'noise': {'min': 1.0}, 'removed': {'min': 1.0}}
+        results = {'fast': {'min': 0.5}, 'slow': {'min': 1.5}, 'noise': {'min': 1.05}, 'added': {'min': 9.0}}
+        assert compare_results(baseline, results, 0.1) == [('slow', 1.0, 1.5)]
@@ -0,0 +1,64 @@
+"""
+Unit tests for bitboard representation of TicTacToe board
+"""
+__author__ = "Markus Juuti"
+
+
+from bitboard import BitBoard, get_line_masks
+from unittest import TestCase
+
+
+class BitBoardUnit(TestCase):
+
+    board = None  # type: BitBoard
+
+    def setUp(self):
+        self.board = BitBoard(3)
+
+    def test_line_masks(self):
+        masks = get_line_masks(3)
+        assert len(masks) == 8, '3x3 board should have 3 rows, 3 columns and 2 diagonals'
+        assert 0b100010001 in masks and 0b001010100 in masks, 'Both diagonals should be included'
+
+    def test_place_and_remove(self):
+        self.board.place(4, 'X')
+        assert not self.board.is_free(4)
+        self.board.remove(4)
+        assert self.board.is_free(4)
+        assert self.board.x_mask == 0 and self.board.o_mask == 0
+
+    def test_row_win(self):
+        for index in range(3):
+            self.board.place(index, 'O')
+        assert self.board.has_won('O') and not self.board.has_won('X')
+        assert self.board.get_winner() == 'O'
+
+    def test_diagonal_up_win(self):
+        for x in range(3):
+            self.board.place(self.board.get_index(x, 2 - x), 'X')
+        assert self.board.get_winner() == 'X'
+
+    def test_winning_move(self):
+        self.board.place(0, 'X')
+        self.board.place(4, 'X')
+        assert self.board.is_winning_move(8, 'X')
+        assert not self.board.is_winning_move(8, 'O')
+        assert not self.board.is_winning_move(5, 'X')
+
+    def test_full_board_and_free_cells(self):
+        for index in range(8):
+            self.board.place(index, 'X' if index % 2 else 'O')
+        assert self.board.get_free_cells() == [8]
+        assert not self.board.is_full()
+        self.board.place(8, 'X')
+        assert self.board.is_full() and self.board.get_free_cells() == []
+
+    def test_from_marker_places(self):
+        board = BitBoard.from_marker_places([['X', ' ', ' '], [' ', 'O', ' '], [' ', ' ', 'X']])
+        assert board.x_mask == 0b100000001 and board.o_mask == 0b000010000
+
+    def test_large_board(self):
+        board = BitBoard(15)
+        for y in range(15):
+            board.place(board.get_index(14, y), 'X')
+        assert board.has_won('X') and len(board.get_free_cells()) == 210
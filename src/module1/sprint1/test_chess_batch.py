@@ -0,0 +1,59 @@
+"""
+Unit tests for batch chess capture analysis
+"""
+__author__ = "Markus Juuti"
+
+
+import os
+import tempfile
+from chess_batch import analyze_lines, analyze_parallel, get_capturable, main, parse_position
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+POSITIONS = [
+    'bishop d4; knight a1; rook g7; pawn c3\n',
+    '4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1\n',
+    '\n',
+    'dragon d4; knight a1\n',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1\n',
+]
+RESULTS = ['g7 c3\n', 'd5\n', '\n', 'ERR Invalid piece and location: dragon d4\n', '-\n']
+
+
+class ChessBatchUnit(TestCase):
+
+    def test_piece_lines(self):
+        board = parse_position('queen d4; rook d8; pawn a6')
+        assert board.count('w') == 1 and board.count('b') == 2
+        assert get_capturable(board) == ['d8']
+
+    def test_fen_lines(self):
+        board = parse_position('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        assert board.count('w') == 3 and board.count('b') == 3
+        assert get_capturable(board) == ['a8', 'h8'], 'Rooks should take rooks on their files only'
+        with self.assertRaises(ValueError):
+            parse_position('8/8/8/8/8/8/8/9')
+
+    def test_analyze_lines_keeps_order(self):
+        assert list(analyze_lines(POSITIONS * 2)) == RESULTS * 2
+
+    def test_analyze_lines_is_lazy(self):
+        def positions():
+            yield POSITIONS[0]
+            raise AssertionError('Next line should not be read before the first result is taken')
+        assert next(analyze_lines(positions())) == RESULTS[0]
+
+    def test_analyze_parallel(self):
+        with ThreadPoolExecutor(2) as executor:
+            results = list(analyze_parallel(POSITIONS * 5, executor, 2, chunk_size=3))
+        assert results == RESULTS * 5
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, 'positions.txt')
+            output_path = os.path.join(directory, 'results.txt')
+            with open(input_path, 'w') as input_file:
+                input_file.writelines(POSITIONS)
+            main([input_path, '--output', output_path])
+            with open(output_path) as output_file:
+                assert output_file.readlines() == RESULTS
@@ -0,0 +1,57 @@
+"""
+Unit tests for chess bitboard
+"""
+__author__ = "Markus Juuti"
+
+
+import random
+from chess_bitboard import KNIGHT_STEPS, SLIDE_DIRECTIONS, SLIDE_RAYS, ChessBitBoard, get_ray_attacks, \
+    get_slide_attacks, get_square, get_squares, get_step_attacks, shift
+from unittest import TestCase
+
+
+class ChessBitBoardUnit(TestCase):
+
+    def test_shift_does_not_wrap(self):
+        assert shift(1 << get_square(3, 7), 0, 1) == 0, 'Square on file h should drop off the board'
+        assert shift(1 << get_square(3, 0), 1, -1) == 0
+        assert shift(1 << get_square(0, 3), -1, 0) == 0
+        assert shift(1 << get_square(3, 3), 1, 1) == 1 << get_square(4, 4)
+
+    def test_step_attacks_of_many_pieces(self):
+        attacks = get_step_attacks(1 << get_square(0, 0) | 1 << get_square(7, 7), KNIGHT_STEPS)
+        assert get_squares(attacks) == [(1, 2), (2, 1), (5, 6), (6, 5)]
+
+    def test_place_remove_and_count(self):
+        board = ChessBitBoard()
+        board.place(get_square(0, 0), 'bB')
+        board.place(get_square(0, 1), 'bH')
+        board.place(get_square(4, 4), 'wB')
+        assert (board.count(), board.count('b'), board.count('w'), board.count('bB')) == (3, 2, 1, 1)
+        board.remove(get_square(0, 0), 'bB')
+        assert board.count('b') == 1 and board.is_free(get_square(0, 0)) and not board.is_free(get_square(4, 4))
+
+    def test_ray_attacks_match_slide_attacks(self):
+        rng = random.Random(1)
+        for square in range(64):
+            for _ in range(20):
+                occupied = rng.getrandbits(64) & rng.getrandbits(64)
+                for piece, directions in SLIDE_DIRECTIONS.items():
+                    assert get_ray_attacks(square, occupied, SLIDE_RAYS[piece]) == \
+                        get_slide_attacks(1 << square, occupied, directions), f'{piece} on {square}'
+
+    def test_ray_attacks_stop_at_first_blocker(self):
+        occupied = 1 << get_square(2, 3) | 1 << get_square(1, 3) | 1 << get_square(5, 5)
+        attacks = get_ray_attacks(get_square(4, 3), occupied, SLIDE_RAYS['rook'])
+        assert get_squares(attacks) == [(2, 3), (3, 3), (4, 0), (4, 1), (4, 2), (4, 4), (4, 5), (4, 6), (4, 7),
+                                        (5, 3), (6, 3), (7, 3)]
+        attacks = get_ray_attacks(get_square(7, 7), occupied, SLIDE_RAYS['bishop'])
+        assert get_squares(attacks) == [(5, 5), (6, 6)], 'Ray towards rank 8 should stop at the blocker'
+
+    def test_piece_attacks_match_side_attacks(self):
+        board = ChessBitBoard()
+        board.place(get_square(4, 4), 'bP')
+        for abbreviation in ('wP', 'wH', 'wB', 'wR', 'wQ', 'wK'):
+            board.place(get_square(5, 3), abbreviation)
+            assert board.get_piece_attacks(get_square(5, 3), abbreviation) == board.get_attacks('w'), abbreviation
+            board.remove(get_square(5, 3), abbreviation)
@@ -4,7 +4,11 @@ Unit tests for chessboard challenge
 __author__ = "Markus Juuti"
 
 
-from chess_challenge import ChessBoard
+import io
+from contextlib import redirect_stdout
+from chess_bitboard import BISHOP_DIRECTIONS, KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, get_slide_attacks, \
+    get_square, get_squares
+from chess_challenge import EMPTY, ChessBoard
 from unittest import TestCase
 
 
@@ -34,7 +38,11 @@ class TTTUnit(TestCase):
 
     # region Invalid entries
     def test_invalid_input_piece(self):
-        assert not self.chess.is_valid_input(f'king a4')
+        assert not self.chess.is_valid_input(f'dragon a4')
+
+    def test_enter_all_pieces(self):
+        for piece in ('pawn', 'knight', 'bishop', 'rook', 'queen', 'king'):
+            assert self.chess.is_valid_input(f'{piece} d4')
 
     def test_invalid_input_location(self):
         assert not self.chess.is_valid_input(f'bishop a9')
@@ -176,3 +184,106 @@ class TTTUnit(TestCase):
         assert len(in_range) == 4
         assert not any([coord for coord in [(2,2), (2,6), (6,2), (6,6)] if coord in in_range])
 
+    def test_attack_tables(self):
+        assert get_squares(KNIGHT_ATTACKS[get_square(0, 0)]) == [(1, 2), (2, 1)]
+        assert bin(KNIGHT_ATTACKS[get_square(4, 4)]).count('1') == 8
+        assert bin(KING_ATTACKS[get_square(7, 7)]).count('1') == 3
+        assert bin(get_slide_attacks(1 << get_square(0, 0), 0, BISHOP_DIRECTIONS)).count('1') == 7
+        assert get_squares(get_slide_attacks(1 << get_square(0, 7), 1 << get_square(2, 5), BISHOP_DIRECTIONS)) == \
+            [(1, 6), (2, 5)], 'Ray should end at the first piece'
+
+    def test_bitboard_follows_board(self):
+        self.chess.add_piece_to_board('bishop', 'c3', 'w')
+        self.chess.board[0][0] = 'bH'
+        self.chess.board[0][1] = 'bB'
+        assert self.chess.black_count == 2 and self.chess.white_count == 1
+        assert self.chess.get_pieces('b') == [(0, 0), (0, 1)] and not self.chess.is_free(0, 1)
+        self.chess.board[0][1] = EMPTY
+        assert self.chess.black_count == 1 and self.chess.is_free(0, 1)
+
+    def test_king_takeouts(self):
+        self.chess.white_type = 'king'
+        self.chess.board[0][0] = 'wK'
+        self.chess.white_coordinates = (0,0)
+
+        self.chess.board[0][1] = 'bB'
+        self.chess.board[1][1] = 'bH'
+        self.chess.board[2][2] = 'bB'
+
+        assert self.chess.get_black_pieces_in_range() == [(0, 1), (1, 1)]
+        assert self.chess.is_valid_move(1, 0) and not self.chess.is_valid_move(2, 2)
+
+    def test_bishop_blocked_by_white_piece(self):
+        self.chess.white_type = 'bishop'
+        self.chess.board[4][4] = 'wB'
+        self.chess.white_coordinates = (4,4)
+
+        self.chess.board[5][5] = 'wH'
+        self.chess.board[6][6] = 'bB'
+        self.chess.board[1][1] = 'bB'
+
+        assert self.chess.get_black_pieces_in_range() == [(1, 1)]
+        assert not self.chess.is_valid_move(6, 6)
+
+    def test_pawn_direction_by_side(self):
+        assert get_squares(PAWN_ATTACKS['w'][get_square(4, 4)]) == [(3, 3), (3, 5)], \
+            'White pawn captures towards rank 8'
+        assert get_squares(PAWN_ATTACKS['b'][get_square(4, 4)]) == [(5, 3), (5, 5)], \
+            'Black pawn captures towards rank 1'
+
+    def test_pawn_takeouts(self):
+        self.chess.add_piece_to_board('pawn', 'e4', 'w')
+        for location in ('d5', 'e5', 'f3', 'f5'):
+            self.chess.add_piece_to_board('rook', location, 'b')
+        assert self.chess.get_black_pieces_in_range() == [(3, 3), (3, 5)], 'Pawn should take d5 and f5 only'
+
+    def test_rook_takeouts_with_obstacles(self):
+        self.chess.add_piece_to_board('rook', 'a1', 'w')
+        for location in ('a5', 'a8', 'h1', 'b2'):
+            self.chess.add_piece_to_board('knight', location, 'b')
+        assert self.chess.get_black_pieces_in_range() == [(3, 0), (7, 7)]
+
+    def test_queen_takeouts(self):
+        self.chess.add_piece_to_board('queen', 'd4', 'w')
+        for location in ('d8', 'd7', 'a1', 'h8', 'g7', 'a4', 'e6'):
+            self.chess.add_piece_to_board('pawn', location, 'b')
+        assert self.chess.get_black_pieces_in_range() == [(1, 3), (1, 6), (4, 0), (7, 0)]
+
+    def test_show_pieces_any_hero(self):
+        self.chess.add_piece_to_board('queen', 'd4', 'w')
+        self.chess.add_piece_to_board('rook', 'd8', 'b')
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.chess.show_pieces_white_can_take()
+        assert 'Rook in d8 can be taken out by our Queen hero' in output.getvalue()
+
+    def test_fen_round_trip(self):
+        fen = 'r3k2r/pp3ppp/2n5/3q4/8/2B5/8/8 w - - 0 1'
+        self.chess = ChessBoard.from_fen(fen)
+        assert self.chess.to_fen() == fen
+        assert self.chess.board[0][0] == 'bR' and self.chess.board[2][2] == 'bH' and self.chess.board[5][2] == 'wB'
+        assert self.chess.black_count == 10 and self.chess.white_count == 1
+        assert (self.chess.white_type, self.chess.white_coordinates) == ('bishop', (5, 2))
+
+    def test_fen_matches_added_pieces(self):
+        self.chess.add_piece_to_board('knight', 'e4', 'w')
+        for location in ('d6', 'f6', 'c3', 'e5'):
+            self.chess.add_piece_to_board('bishop', location, 'b')
+        fen_chess = ChessBoard.from_fen(self.chess.to_fen())
+        assert fen_chess.to_fen() == self.chess.to_fen() == '8/8/3b1b2/4b3/4N3/2b5/8/8 w - - 0 1'
+        assert (fen_chess.white_type, fen_chess.white_coordinates) == ('knight', (4, 4))
+        assert fen_chess.bitboard.pieces == self.chess.bitboard.pieces
+        assert fen_chess.get_black_pieces_in_range() == self.chess.get_black_pieces_in_range() == \
+            [(2, 3), (2, 5), (5, 2)]
+
+    def test_fen_board_stays_in_sync(self):
+        self.chess = ChessBoard.from_fen('8/8/8/8/3B4/8/8/k7')
+        assert self.chess.get_black_pieces_in_range() == [(7, 0)]
+        self.chess.board[6][1] = 'bP'
+        assert self.chess.get_black_pieces_in_range() == [(6, 1)], 'Pieces set after loading should block'
+
+    def test_invalid_fen(self):
+        for fen in ('8/8/8/8/8/8/8', '8/8/8/8/8/8/8/7X', '8/8/8/8/8/8/8/44p', '8/8/8/8/8/8/8/k7',
+                    'r3k2r/pp3ppp/2n5/3q4/8/2B5/PPP2PPP/R3K2R w - - 0 1'):
+            with self.assertRaises(ValueError):
+                ChessBoard.from_fen(fen)
@@ -0,0 +1,73 @@
+"""
+Unit tests for static evaluation of unfinished positions
+"""
+__author__ = "Markus Juuti"
+
+
+import random
+from evaluation import HEURISTIC_LIMIT, LineEvaluator, get_evaluator
+from tictactoe import get_winning_lines
+from unittest import TestCase
+
+
+class LineEvaluatorUnit(TestCase):
+
+    evaluator = None  # type: LineEvaluator
+
+    def setUp(self):
+        self.evaluator = LineEvaluator(get_winning_lines(5, 4), 4)
+        self.evaluator.reset([[' '] * 5 for _ in range(5)])
+
+    def test_empty_board_is_even(self):
+        assert self.evaluator.score == 0
+
+    def test_incremental_score_matches_reset(self):
+        random.seed(1)
+        board = [[' '] * 5 for _ in range(5)]
+        cells = random.sample([(x, y) for x in range(5) for y in range(5)], 12)
+        for n, (x, y) in enumerate(cells):
+            marker = 'XO'[n % 2]
+            board[x][y] = marker
+            self.evaluator.place(x, y, marker)
+        score = self.evaluator.score
+
+        fresh = LineEvaluator(get_winning_lines(5, 4), 4)
+        fresh.reset(board)
+        assert abs(fresh.score - score) < 1e-12, 'Incremental score should match scoring the whole board'
+
+        for n, (x, y) in reversed(list(enumerate(cells))):
+            self.evaluator.remove(x, y, 'XO'[n % 2])
+        assert self.evaluator.score == 0, 'Removing all markers should give the empty board score'
+
+    def test_players_are_symmetric(self):
+        self.evaluator.place(2, 2, 'O')
+        o_score = self.evaluator.score
+        self.evaluator.remove(2, 2, 'O')
+        self.evaluator.place(2, 2, 'X')
+        assert o_score > 0 and self.evaluator.score == -o_score
+
+    def test_center_better_than_corner(self):
+        self.evaluator.place(2, 2, 'O')
+        center_score = self.evaluator.score
+        self.evaluator.remove(2, 2, 'O')
+        self.evaluator.place(0, 0, 'O')
+        assert center_score > self.evaluator.score, 'Center should be on more open lines than corner'
+
+    def test_blocking_removes_opponent_lines(self):
+        for y in range(3):
+            self.evaluator.place(1, y, 'X')
+        unblocked = self.evaluator.score
+        self.evaluator.place(1, 3, 'O')
+        assert unblocked < self.evaluator.score, 'Blocking three in a row should improve the score'
+
+    def test_score_stays_within_limit(self):
+        for x in range(5):
+            for y in range(4):
+                self.evaluator.place(x, y, 'O')
+        assert 0 < self.evaluator.score < HEURISTIC_LIMIT < 100 / 225, 'Heuristic should stay below any win'
+
+    def test_get_evaluator(self):
+        assert isinstance(get_evaluator('lines', get_winning_lines(3, 3), 3), LineEvaluator)
+        assert get_evaluator('none', get_winning_lines(3, 3), 3) is None
+        with self.assertRaises(ValueError):
+            get_evaluator('material', get_winning_lines(3, 3), 3)
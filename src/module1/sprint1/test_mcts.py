@@ -0,0 +1,84 @@
+"""
+Unit tests for Monte Carlo tree search AI
+"""
+__author__ = "Markus Juuti"
+
+
+from bitboard import BitBoard
+from mcts import MonteCarloTreeSearch
+from unittest import TestCase
+from time import perf_counter
+
+
+class MonteCarloUnit(TestCase):
+
+    board = None  # type: BitBoard
+
+    def setUp(self):
+        self.board = BitBoard(3)
+
+    def place(self, marker: str, *cells):
+        for x, y in cells:
+            self.board.place(self.board.get_index(x, y), marker)
+
+    def test_empty_board_center(self):
+        self.board = BitBoard(15, 5)
+        assert self.board.get_coordinates(MonteCarloTreeSearch().get_move(self.board, 'O')) == (7, 7)
+
+    def test_immediate_win(self):
+        self.place('O', (1, 1), (0, 0))
+        self.place('X', (0, 1), (2, 1), (0, 2))
+        assert self.board.get_coordinates(MonteCarloTreeSearch().get_move(self.board, 'O')) == (2, 2)
+
+    def test_block_opponent_win(self):
+        self.place('X', (0, 0), (0, 1))
+        self.place('O', (2, 2))
+        assert self.board.get_coordinates(MonteCarloTreeSearch().get_move(self.board, 'O')) == (0, 2)
+
+    def test_board_unchanged(self):
+        self.place('X', (0, 0))
+        x_mask, o_mask = self.board.x_mask, self.board.o_mask
+        MonteCarloTreeSearch(200).get_move(self.board, 'O')
+        assert (self.board.x_mask, self.board.o_mask) == (x_mask, o_mask)
+
+    def test_corner_opening_answered_in_center(self):
+        self.place('X', (0, 0))
+        move = MonteCarloTreeSearch(3000).get_move(self.board, 'O')
+        assert self.board.get_coordinates(move) == (1, 1), 'Only center reply draws against a corner'
+
+    def test_playout_budget(self):
+        self.place('X', (1, 1))
+        search = MonteCarloTreeSearch(250)
+        search.get_move(self.board, 'O')
+        assert search.nodes_visited == 250
+        assert search.root.visits == 250
+
+    def test_time_budget(self):
+        self.board = BitBoard(15, 5)
+        self.place('X', (7, 7))
+        search = MonteCarloTreeSearch(think_ms=50)
+        search_start = perf_counter()
+        search.get_move(self.board, 'O')
+        assert perf_counter() - search_start < 0.5, 'Search should stop when time budget runs out'
+        assert search.nodes_visited > 0
+
+    def test_tree_reused_between_turns(self):
+        self.board = BitBoard(7, 4)
+        self.place('X', (3, 3))
+        search = MonteCarloTreeSearch(500)
+        move = search.get_move(self.board, 'O')
+        self.board.place(move, 'O')
+        reply, subtree = max(search.root.children[move].children.items(), key=lambda item: item[1].visits)
+        self.board.place(reply, 'X')
+        search.get_move(self.board, 'O')
+        assert search.root is subtree, 'Position after both moves should be found in the old tree'
+        assert search.root.visits > search.nodes_visited
+
+    def test_new_tree_for_unknown_position(self):
+        self.place('X', (1, 1))
+        search = MonteCarloTreeSearch(100)
+        search.get_move(self.board, 'O')
+        self.board = BitBoard(3)
+        self.place('X', (0, 0))
+        search.get_move(self.board, 'O')
+        assert search.root.visits == 100
@@ -0,0 +1,99 @@
+"""
+Unit tests for persistent AI move cache
+"""
+__author__ = "Markus Juuti"
+
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from position_cache import PositionCache
+from unittest import TestCase
+
+RULES = '3x3 win=3'
+
+
+def get_board(cell: int) -> list:
+    """
+    Get 5x5 board with a single X
+    :param cell: index of the X, row by row
+    :return: list of lists of markers
+    """
+    board = [[' '] * 5 for _ in range(5)]
+    board[cell // 5][cell % 5] = 'X'
+    return board
+
+
+def store_moves(path: str, first: int) -> int:
+    """
+    Store moves to the cache from another process
+    :param path: cache file
+    :param first: first of the cells to fill, one position for each
+    :return: number of moves stored
+    """
+    cache = PositionCache(path)
+    for cell in range(first, first + 4):
+        cache.store('5x5 win=5', get_board(cell), (2, 2))
+    cache.close()
+    return 4
+
+
+class PositionCacheUnit(TestCase):
+
+    directory = None  # type: tempfile.TemporaryDirectory
+    path = None  # type: str
+    cache = None  # type: PositionCache
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'moves.db')
+        self.cache = PositionCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_store_and_lookup(self):
+        board = [['X', ' ', ' '], [' ', ' ', ' '], [' ', ' ', ' ']]
+        assert self.cache.lookup(RULES, board) is None
+        self.cache.store(RULES, board, (1, 1))
+        assert self.cache.lookup(RULES, board) == (1, 1)
+        assert self.cache.lookup('3x3 win=3 depth=2', board) is None, 'Other rules should not share moves'
+
+    def test_symmetric_positions_share_move(self):
+        self.cache.store(RULES, [['X', 'O', ' '], [' ', ' ', ' '], [' ', ' ', ' ']], (1, 1))
+        self.cache.store(RULES, [['X', ' ', ' '], ['O', ' ', ' '], [' ', ' ', ' ']], (2, 0))
+        assert len(self.cache) == 1, 'Mirrored position should replace the same entry'
+        assert self.cache.lookup(RULES, [[' ', 'O', 'X'], [' ', ' ', ' '], [' ', ' ', ' ']]) == (0, 0), \
+            'Move should map to the same cell of the mirrored board'
+
+    def test_persists_between_connections(self):
+        board = [[' ', ' ', ' '], [' ', 'X', ' '], [' ', ' ', ' ']]
+        self.cache.store(RULES, board, (0, 0))
+        self.cache.close()
+        self.cache = PositionCache(self.path)
+        assert self.cache.lookup(RULES, board) in ((0, 0), (0, 2), (2, 0), (2, 2))
+
+    def test_least_recently_used_removed(self):
+        self.cache.max_size = 2
+        self.cache.prune_interval = 1
+        # stores and lookups in quick succession could get the same time
+        self.cache.clock = count().__next__
+        boards = [[[' '] * 3 for _ in range(3)] for _ in range(3)]
+        boards[0][0][0], boards[1][0][1], boards[2][1][1] = 'X', 'X', 'X'
+        self.cache.store(RULES, boards[0], (1, 1))
+        self.cache.store(RULES, boards[1], (1, 1))
+        self.cache.lookup(RULES, boards[0])
+        self.cache.store(RULES, boards[2], (0, 0))
+        assert len(self.cache) == 2
+        assert self.cache.lookup(RULES, boards[1]) is None, 'Least recently used move should be removed'
+
+    def test_concurrent_writers(self):
+        with ProcessPoolExecutor(4) as executor:
+            stored = sum(executor.map(store_moves, [self.path] * 4, range(0, 16, 4)))
+        positions = sum(moves for _, moves in self.cache.get_rule_counts())
+        # mirrored boards share an entry
+        assert stored == 16 and positions == len({self.cache.get_position(get_board(cell))[0] for cell in range(16)})
+        for cell in range(16):
+            assert self.cache.lookup('5x5 win=5', get_board(cell)) == (2, 2), f'Move of cell {cell} should be stored'
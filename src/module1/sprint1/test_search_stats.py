@@ -0,0 +1,38 @@
+"""
+Unit tests for search statistics
+"""
+__author__ = "Markus Juuti"
+
+
+from search_stats import SearchStats
+from unittest import TestCase
+
+
+class SearchStatsUnit(TestCase):
+
+    def test_counters(self):
+        stats = SearchStats()
+        for depth, terminal in ((2, False), (3, True), (3, True)):
+            stats.add_node(depth, terminal)
+        stats.add_cache_probe(True)
+        stats.add_cache_probe(False)
+        assert stats.nodes == 3 and stats.nodes_by_depth == {2: 1, 3: 2}
+        assert stats.terminal_evaluations == 2 and stats.cache_hit_rate == 0.5
+
+    def test_merge(self):
+        stats, other = SearchStats(), SearchStats()
+        stats.add_node(2, False)
+        other.add_node(2, True)
+        other.add_node(4, True)
+        other.cutoffs = 3
+        stats.merge(other)
+        assert stats.nodes_by_depth == {2: 2, 4: 1}
+        assert stats.terminal_evaluations == 2 and stats.cutoffs == 3
+
+    def test_as_dict(self):
+        stats = SearchStats()
+        stats.iteration_times[1] = 0.5
+        summary = stats.as_dict()
+        assert summary['nodes'] == 0 and summary['cache_hit_rate'] == 0.0
+        assert summary['iteration_times'] == {1: 0.5}
+        assert 'iteration 1: 0.500s' in str(stats)
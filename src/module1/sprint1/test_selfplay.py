@@ -0,0 +1,43 @@
+"""
+Unit tests for self-play tournament runner
+"""
+__author__ = "Markus Juuti"
+
+
+from selfplay import get_statistics, play_game, run_tournament
+from tictactoe import GameSettings
+from unittest import TestCase
+
+
+class SelfPlayUnit(TestCase):
+
+    settings = GameSettings(quiet=True, board_backend='bitboard')
+
+    def test_ai_vs_ai_draws(self):
+        result, durations, nodes = play_game(self.settings, 'ai', 0)
+        assert result == 'draw', 'Perfect play should end in a draw'
+        assert len(durations) == 9 and nodes > 0
+
+    def test_random_opponent_never_wins(self):
+        for seed in range(10):
+            result, durations, _ = play_game(self.settings, 'random', seed)
+            assert result in ('O', 'draw'), 'Random player should not beat alpha-beta search'
+            assert len(durations) <= 4, 'Only AI moves should be timed'
+
+    def test_same_seed_same_game(self):
+        first = play_game(GameSettings(quiet=True, search='mcts', playouts=50), 'random', 7)
+        second = play_game(GameSettings(quiet=True, search='mcts', playouts=50), 'random', 7)
+        assert (first[0], first[2]) == (second[0], second[2])
+
+    def test_statistics(self):
+        results = [('O', [0.01, 0.03], 200), ('draw', [0.02, 0.02], 200), ('X', [0.1], 100)]
+        stats = get_statistics(results, 2.0)
+        assert stats['games'] == 3 and stats['games_per_sec'] == 1.5
+        assert round(stats['nodes_per_sec']) == 2778
+        assert round(stats['mean_latency_ms']) == 36 and round(stats['p95_latency_ms']) == 100
+        assert [round(stats[rate], 2) for rate in ('x_win_rate', 'o_win_rate', 'draw_rate')] == [0.33] * 3
+
+    def test_run_tournament(self):
+        stats = run_tournament(GameSettings(quiet=True, search='threat'), 'random', 5)
+        assert stats['games'] == 5
+        assert round(stats['x_win_rate'] + stats['o_win_rate'] + stats['draw_rate'], 6) == 1
@@ -0,0 +1,136 @@
+"""
+Unit tests for asyncio game server
+"""
+__author__ = "Markus Juuti"
+
+
+import asyncio
+import os
+import tempfile
+from server import GameServer, GameSession, SearchPool, _forget_game, _games, _search_ai_move
+from tablebase import TableBaseGenerator
+from tictactoe import GameSettings
+from time import perf_counter
+from unittest import IsolatedAsyncioTestCase
+
+
+class GameServerUnit(IsolatedAsyncioTestCase):
+
+    pool = None  # type: SearchPool
+    server = None  # type: asyncio.AbstractServer
+    writers = None  # type: list
+
+    async def asyncSetUp(self):
+        self.pool = SearchPool(2)
+        self.server = await GameServer(self.pool).start()
+        self.writers = list()
+
+    async def asyncTearDown(self):
+        # server waits for open connections when closing
+        for writer in self.writers:
+            writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+        self.pool.shutdown()
+
+    async def connect(self) -> tuple:
+        port = self.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        self.writers.append(writer)
+        await self.read_reply(reader)
+        return reader, writer
+
+    @staticmethod
+    async def command(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, line: str) -> list:
+        writer.write(f'{line}\n'.encode())
+        await writer.drain()
+        return await GameServerUnit.read_reply(reader)
+
+    @staticmethod
+    async def read_reply(reader: asyncio.StreamReader) -> list:
+        lines = list()
+        while not lines or not lines[-1].startswith(('OK', 'ERR')):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError(f'Connection closed after {lines}')
+            lines.append(line.decode().rstrip('\n'))
+        return lines
+
+    async def test_play_against_ai(self):
+        reader, writer = await self.connect()
+        reply = await self.command(reader, writer, 'MOVE 0,0')
+        assert reply[0] == 'AI 1,1' and reply[-1] == 'OK X in turn', 'AI should answer corner with center'
+        assert reply[2] == '| X|  |  |'
+        reply = await self.command(reader, writer, 'MOVE 0,0')
+        assert reply[-1].startswith('ERR')
+
+    async def test_two_player_game(self):
+        reader, writer = await self.connect()
+        reply = await self.command(reader, writer, 'NEW --players 2 --size 4')
+        assert reply[-1] == 'OK new 4x4 game, X in turn' and len(reply) == 10, 'Board should have 9 lines'
+        for n in range(3):
+            await self.command(reader, writer, f'MOVE 0,{n}')
+            await self.command(reader, writer, f'MOVE 1,{n}')
+        reply = await self.command(reader, writer, 'MOVE 0,3')
+        assert reply[-2:] == ['RESULT X', 'OK game over']
+
+    async def test_invalid_commands(self):
+        reader, writer = await self.connect()
+        assert (await self.command(reader, writer, 'NEW --size 20'))[-1] == 'ERR Grid size must be between 3 and 15'
+        assert (await self.command(reader, writer, 'MOVE a'))[-1].startswith('ERR')
+        assert (await self.command(reader, writer, 'JUMP'))[-1] == 'ERR unknown command: JUMP'
+        assert (await self.command(reader, writer, 'BOARD'))[-1] == 'OK X in turn'
+
+    async def test_slow_search_does_not_block_other_sessions(self):
+        slow_reader, slow_writer = await self.connect()
+        await self.command(slow_reader, slow_writer, 'NEW --size 7 --think-ms 500')
+        slow_writer.write(b'MOVE 3,3\n')
+        await slow_writer.drain()
+        await asyncio.sleep(0.1)
+
+        reader, writer = await self.connect()
+        start = perf_counter()
+        reply = await self.command(reader, writer, 'BOARD')
+        assert reply[-1] == 'OK X in turn' and perf_counter() - start < 0.3, \
+            'Other sessions should be served while AI is searching'
+        assert (await self.read_reply(slow_reader))[0].startswith('AI ')
+
+    async def test_session_without_executor(self):
+        session = GameSession()
+        reply = await session.handle_command('MOVE 1,1')
+        assert reply[0].startswith('AI ') and reply[-1] == 'OK X in turn'
+
+    async def test_book_is_server_option(self):
+        reader, writer = await self.connect()
+        assert (await self.command(reader, writer, 'NEW --book /etc/hosts'))[-1] == 'ERR --book is a server option'
+
+    def test_worker_keeps_search_state(self):
+        settings = GameSettings(quiet=True)
+        moves = (((0, 0), 'X'),)
+        ai_move = _search_ai_move(-1, settings, moves, 'O')
+        game, played = _games[-1]
+        assert played == moves and len(game.transposition_table) > 0
+        moves += ((ai_move, 'O'), ((2, 2), 'X'))
+        _search_ai_move(-1, settings, moves, 'O')
+        assert _games[-1][0] is game, 'Game and its search state should be kept between moves'
+        assert game.marker_places[2][2] == 'X' and game.marker_places[ai_move[0]][ai_move[1]] == 'O'
+        _search_ai_move(-1, settings, moves[:1], 'O')
+        assert _games[-1][0] is not game, 'New game of the session should start from an empty board'
+        _forget_game(-1)
+        assert -1 not in _games
+
+    def test_worker_opens_server_book(self):
+        book_path = os.path.join(tempfile.mkdtemp(), 'ttt3.book')
+        generator = TableBaseGenerator(3)
+        generator.solve()
+        generator.write(book_path)
+        session = GameSession(book=book_path)
+        try:
+            settings = session.game.settings
+            assert settings.book == book_path and session.game.book is not None
+            _search_ai_move(-1, settings, (((0, 0), 'X'),), 'O')
+            assert _games[-1][0].book is not None, 'Worker should open the book of the server'
+        finally:
+            _forget_game(-1)
+            session.close()
+            os.remove(book_path)
@@ -0,0 +1,52 @@
+"""
+Unit tests for perfect-play tablebase
+"""
+__author__ = "Markus Juuti"
+
+
+import os
+import tempfile
+from tablebase import TableBase, TableBaseGenerator, WIN_SCORE
+from unittest import TestCase
+
+
+class TableBaseUnit(TestCase):
+
+    table_path = None  # type: str
+    table = None  # type: TableBase
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table_path = os.path.join(tempfile.mkdtemp(), 'ttt3.book')
+        generator = TableBaseGenerator(3)
+        generator.solve()
+        generator.write(cls.table_path)
+
+    def setUp(self):
+        self.table = TableBase(self.table_path)
+
+    def tearDown(self):
+        self.table.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.table_path)
+
+    def test_empty_board_is_draw(self):
+        move, score = self.table.lookup([[' '] * 3 for _ in range(3)])
+        assert score == 0, 'Perfect play from empty board should end in a draw'
+
+    def test_winning_move(self):
+        move, score = self.table.lookup([['X', 'X', ' '], ['O', 'O', ' '], ['X', ' ', ' ']])
+        assert move == (1, 2) and score == WIN_SCORE - 1, 'O should complete the middle row'
+
+    def test_symmetric_positions(self):
+        move, score = self.table.lookup([[' ', 'X', 'X'], [' ', 'O', 'O'], [' ', ' ', 'X']])
+        assert move == (1, 0) and score == WIN_SCORE - 1, 'Mirrored position should map move back'
+
+    def test_forced_block(self):
+        move, score = self.table.lookup([['X', 'X', ' '], ['O', ' ', ' '], [' ', ' ', ' ']])
+        assert move == (0, 2) and score < 0, 'O should block, but the position is lost'
+
+    def test_rules_stored(self):
+        assert (self.table.grid_width, self.table.win_length) == (3, 3)
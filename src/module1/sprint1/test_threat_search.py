@@ -0,0 +1,68 @@
+"""
+Unit tests for threat-space search AI
+"""
+__author__ = "Markus Juuti"
+
+
+from bitboard import BitBoard
+from threat_search import ThreatSpaceSearch
+from unittest import TestCase
+
+
+class ThreatSearchUnit(TestCase):
+
+    board = None  # type: BitBoard
+
+    def setUp(self):
+        self.board = BitBoard(15, 5)
+
+    def place(self, marker: str, *cells):
+        for x, y in cells:
+            self.board.place(self.board.get_index(x, y), marker)
+
+    def get_move(self, marker: str = 'O') -> tuple:
+        return self.board.get_coordinates(ThreatSpaceSearch(self.board).get_move(marker))
+
+    def test_empty_board_center(self):
+        assert self.get_move() == (7, 7)
+
+    def test_candidates_near_markers(self):
+        self.place('X', (0, 0))
+        candidates = ThreatSpaceSearch(self.board).get_candidates()
+        assert len(candidates) == 8, 'Corner marker should have 8 free cells within 2 steps'
+
+    def test_immediate_win(self):
+        self.place('O', (3, 3), (3, 4), (3, 5), (3, 6))
+        self.place('X', (3, 2), (5, 5), (6, 6), (7, 7))
+        assert self.get_move() == (3, 7), 'Four in a row should be completed rather than blocked'
+
+    def test_block_opponent_win(self):
+        self.place('X', (5, 5), (6, 6), (7, 7), (8, 8))
+        self.place('O', (4, 4), (0, 1))
+        assert self.get_move() == (9, 9)
+
+    def test_forced_win_with_fours(self):
+        # two broken lines crossing at (7, 7): playing there makes two fours at once
+        self.place('O', (7, 4), (7, 5), (7, 6), (4, 7), (5, 7), (6, 7))
+        self.place('X', (7, 3), (3, 7), (0, 0), (0, 2), (14, 14), (14, 12))
+        assert self.get_move() == (7, 7)
+
+    def test_block_open_three(self):
+        self.place('X', (7, 6), (7, 7), (7, 8), (3, 3))
+        self.place('O', (8, 7), (12, 12))
+        assert self.get_move() in [(7, 5), (7, 9), (7, 4), (7, 10)], \
+            'Open three should be blocked before it becomes an open four'
+
+    def test_forced_win_with_open_threes(self):
+        # no fours to make, but (7, 7) makes two open threes and X can block only one of them
+        self.place('O', (7, 5), (7, 6), (5, 7), (6, 7))
+        self.place('X', (0, 0), (14, 14), (0, 14), (14, 0))
+        search = ThreatSpaceSearch(self.board)
+        assert search._get_four_moves(self.board.get_mask('O'), self.board.get_mask('X')) == []
+        assert self.board.get_coordinates(search._find_forced_win('O', 'X', search.max_threat_depth)) == (7, 7)
+
+    def test_single_open_three_not_forced_win(self):
+        self.place('O', (7, 5), (7, 6))
+        self.place('X', (0, 0), (14, 14))
+        search = ThreatSpaceSearch(self.board)
+        assert search._find_forced_win('O', 'X', search.max_threat_depth) is None, 'Open three can be blocked'
@@ -1,7 +1,14 @@
 # region unit tests
-from tictactoe import TicTacToe
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from tablebase import TableBase, TableBaseGenerator
+from tictactoe import GameSettings, TicTacToe
 from unittest import TestCase
 from math import ceil
+from time import perf_counter
 
 
 class TTTUnit(TestCase):
@@ -33,6 +40,31 @@ class TTTUnit(TestCase):
         for n in range(self.game_instance.grid_width):
             self.game_instance.marker_places[n][self.game_instance.grid_width - (n + 1)] = "u"
         assert self.game_instance._check_win_condition_impl(), 'Game should end in win condition on diagonal up line'
+
+    def test_incremental_winning_condition(self):
+        for m in range(self.game_instance.grid_width):
+            assert not self.game_instance._is_line_completed(0, 0, 'X'), 'Row should not be claimed yet'
+            self.game_instance._enter_move([0, m], 'X')
+        assert self.game_instance._is_line_completed(0, 0, 'X'), 'Claimed row should be found from any of its cells'
+        assert not self.game_instance._is_line_completed(0, 0, 'O')
+
+        self.game_instance.check_game_end_condition()
+        assert self.game_instance.terminated and self.game_instance.winner == 'X'
+
+    def test_win_length_winning_condition(self):
+        self.game_instance.grid_width = 6
+        self.game_instance.win_length = 4
+        self.game_instance.reset_board()
+        for n in range(1, 5):
+            self.game_instance.marker_places[n][5 - n] = "w"
+        assert self.game_instance._check_win_condition_impl(), 'Game should end with 4 in a row on 6x6 board'
+
+        self.game_instance.reset_board()
+        for n in range(1, 4):
+            self.game_instance._enter_move([2, n], 'O')
+        assert not self.game_instance._is_line_completed(2, 1, 'O')
+        self.game_instance._enter_move([2, 4], 'O')
+        assert self.game_instance._is_line_completed(2, 1, 'O')
     # endregion
 
     # region no win conditions
@@ -77,10 +109,321 @@ class TTTUnit(TestCase):
             'Game should not end in win condition on a full stalemate table'
     # endregion
 
+    # region Engine API
+    def test_apply_move_and_result(self):
+        self.game_instance.quiet = True
+        for x, y, marker in ((0, 0, 'X'), (1, 0, 'O'), (0, 1, 'X'), (1, 1, 'O')):
+            self.game_instance.apply_move((x, y), marker)
+        assert self.game_instance.get_result() is None and len(self.game_instance.get_legal_moves()) == 5
+        self.game_instance.apply_move((0, 2), 'X')
+        assert self.game_instance.get_result() == 'X' and self.game_instance.get_legal_moves() == []
+        self.assertRaises(ValueError, self.game_instance.apply_move, (2, 2), 'O')
+
+    def test_draw_after_win_on_same_game(self):
+        self.game_instance.quiet = True
+        for x, y, marker in ((0, 0, 'X'), (1, 0, 'O'), (0, 1, 'X'), (1, 1, 'O'), (0, 2, 'X')):
+            self.game_instance.apply_move((x, y), marker)
+        assert self.game_instance.get_result() == 'X'
+        self.game_instance.reset_board()
+        for x, y, marker in ((0, 0, 'X'), (1, 1, 'O'), (0, 1, 'X'), (0, 2, 'O'), (2, 0, 'X'), (1, 0, 'O'),
+                             (1, 2, 'X'), (2, 1, 'O'), (2, 2, 'X')):
+            self.game_instance.apply_move((x, y), marker)
+        assert self.game_instance.get_result() == 'draw', 'Winner of the previous game should not be kept'
+
+    def test_apply_move_not_allowed(self):
+        self.game_instance.apply_move((1, 1), 'X')
+        self.assertRaises(ValueError, self.game_instance.apply_move, (1, 1), 'O')
+        self.assertRaises(ValueError, self.game_instance.apply_move, (3, 0), 'O')
+
+    def test_ai_move_for_x(self):
+        self.game_instance = TicTacToe(GameSettings(quiet=True))
+        self.game_instance.apply_move((0, 0), 'O')
+        self.game_instance.apply_move((1, 1), 'X')
+        self.game_instance.apply_move((0, 1), 'O')
+        assert self.game_instance.get_ai_move('X') == (0, 2), 'AI playing X should block O'
+        assert self.game_instance.marker_places[0][0] == 'O', 'Board should be restored after search'
+
+    def test_ai_vs_ai_draw(self):
+        self.game_instance = TicTacToe(GameSettings(quiet=True))
+        marker = 'X'
+        while self.game_instance.get_result() is None:
+            self.game_instance.apply_move(self.game_instance.get_ai_move(marker), marker)
+            marker = 'O' if marker == 'X' else 'X'
+        assert self.game_instance.get_result() == 'draw', 'Perfect play should end in a draw'
+    # endregion
+
     # region AI
     def test_ai_move_empty_table(self):
         ai_move = self.game_instance._get_ai_move()
         assert ai_move[0].is_integer() and ai_move[1].is_integer(), 'AI should give valid coordinates'
+
+    def test_random_ai_move_last_free_cell(self):
+        self.game_instance = TicTacToe(GameSettings(smart=False))
+        for n in range(self.game_instance.grid_width):
+            for m in range(self.game_instance.grid_width):
+                if (n, m) != (1, 2):
+                    self.game_instance._enter_move([n, m], 'X' if (n + m) % 2 else 'O')
+        assert self.game_instance._get_ai_move() == [1, 2], 'Random AI should pick from free cells only'
+
+    def test_settings_from_arguments(self):
+        settings = GameSettings.from_arguments(['--size', '5', '--dumb', '--players', '2'])
+        assert (settings.size, settings.smart, settings.players) == (5, False, 2)
+        game = TicTacToe(settings)
+        assert game.grid_width == 5 and game.players == 2
+
+    def test_unsupported_think_ms_arguments(self):
+        for argv in (['--think-ms', '100', '--search', 'minimax'], ['--think-ms', '100', '--workers', '2']):
+            with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+                GameSettings.from_arguments(argv)
+
+    def test_alphabeta_matches_minimax(self):
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._enter_move([1, 1], 'O')
+        self.game_instance._enter_move([2, 1], 'X')
+
+        self.game_instance.nodes_visited = 0
+        minimax_scores = self.game_instance._minimax_search_impl(1, True)
+        minimax_nodes = self.game_instance.nodes_visited
+        self.game_instance.nodes_visited = 0
+        alphabeta_scores = self.game_instance._alphabeta_search_impl(1, True)
+        alphabeta_nodes = self.game_instance.nodes_visited
+
+        best_score = max(score for score, _ in minimax_scores)
+        best_moves = sorted(move for score, move in minimax_scores if score == best_score)
+        assert best_score == max(score for score, _ in alphabeta_scores), 'Best scores should match'
+        assert best_moves == sorted(move for score, move in alphabeta_scores if score == best_score), \
+            'Alpha-beta should find all equally good moves for random tie-breaking'
+        assert alphabeta_nodes < minimax_nodes, 'Alpha-beta should visit fewer positions than minimax'
+
+    def test_ordered_moves_threat_first(self):
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._enter_move([0, 1], 'X')
+        self.game_instance._enter_move([2, 0], 'O')
+        self.game_instance._enter_move([2, 1], 'O')
+        moves = self.game_instance._get_ordered_moves(True)
+        assert moves[:2] == [(2, 2), (0, 2)], 'Winning move should be tried first, then blocking move'
+        assert moves[2] == (1, 1), 'Center should be tried before other moves'
+
+    def test_transposition_table_reused_between_turns(self):
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._enter_move(self.game_instance._get_best_move_coordinates(), 'O')
+        self.game_instance._enter_move([2, 2], 'X')
+        stored_positions = len(self.game_instance.transposition_table)
+        first_move_nodes = self.game_instance.nodes_visited
+
+        self.game_instance._get_best_move_coordinates()
+        assert stored_positions > 0, 'Searched positions should be stored to transposition table'
+        assert self.game_instance.transposition_table.hits > 0, 'Stored positions should be looked up'
+        assert self.game_instance.nodes_visited < first_move_nodes
+
+    def test_bitboard_search_matches_list_board(self):
+        moves = [((0, 0), 'X'), ((1, 1), 'O'), ((2, 1), 'X')]
+        for move, marker in moves:
+            self.game_instance._enter_move(move, marker)
+        list_scores = sorted(self.game_instance._alphabeta_search_impl(1, True))
+
+        self.game_instance.board_backend = 'bitboard'
+        self.game_instance.reset_board()
+        for move, marker in moves:
+            self.game_instance._enter_move(move, marker)
+        bitboard_scores = sorted(self.game_instance._alphabeta_search_impl(1, True))
+        assert list_scores == bitboard_scores, 'Both board backends should score moves equally'
+
+    def test_bitboard_win_condition(self):
+        self.game_instance.board_backend = 'bitboard'
+        self.game_instance.reset_board()
+        for n in range(self.game_instance.grid_width):
+            self.game_instance._enter_move([n, n], 'O')
+        assert self.game_instance._check_win_condition_impl() and self.game_instance.winner == 'O'
+
+    def test_threat_search_move(self):
+        self.game_instance.grid_width = 9
+        self.game_instance.win_length = 5
+        self.game_instance.search_mode = 'threat'
+        self.game_instance.reset_board()
+        for n in range(4):
+            self.game_instance._enter_move([n + 2, 3], 'X')
+        self.game_instance._enter_move([1, 3], 'O')
+        assert self.game_instance._get_best_move_coordinates() == (6, 3), 'Threat search should block four'
+
+    def test_mcts_move_on_large_board(self):
+        self.game_instance = TicTacToe(GameSettings(size=9, win_length=5, search='mcts', playouts=200))
+        for n in range(4):
+            self.game_instance._enter_move([n + 2, 3], 'X')
+        self.game_instance._enter_move([1, 3], 'O')
+        assert self.game_instance._get_best_move_coordinates() == (6, 3), 'MCTS should block four'
+
+    def test_large_board_falls_back_to_mcts(self):
+        self.game_instance = TicTacToe(GameSettings(size=8, playouts=100))
+        self.game_instance._enter_move([3, 3], 'X')
+        move = self.game_instance._get_best_move_coordinates()
+        assert self.game_instance._is_allowed_move(move, True)
+        assert self.game_instance._mcts is not None, \
+            'Exhaustive search should not be used on boards wider than ai_max_grid'
+
+    def test_depth_limited_search_uses_evaluation(self):
+        scores = dict()
+        for evaluation in ('lines', 'none'):
+            self.game_instance = TicTacToe(GameSettings(size=7, win_length=4, quiet=True, evaluation=evaluation))
+            self.game_instance.max_depth = 2
+            self.game_instance._enter_move([3, 3], 'X')
+            scores[evaluation] = self.game_instance._alphabeta_search_impl(1, True)
+        assert {score for score, _ in scores['none']} == {0}, 'Without evaluation unfinished lines look even'
+        best_score = max(score for score, _ in scores['lines'])
+        assert sorted(move for score, move in scores['lines'] if score == best_score) == \
+            [(2, 3), (3, 2), (3, 4), (4, 3)], 'Shallow search should block the most open lines next to X'
+
+    def test_position_cache_shared_between_games(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = GameSettings(cache=os.path.join(directory, 'moves.db'), quiet=True)
+            self.game_instance = TicTacToe(settings)
+            self.game_instance._enter_move([0, 0], 'X')
+            move = self.game_instance._get_ai_move()
+            assert self.game_instance.nodes_visited > 0
+            self.game_instance.close()
+
+            self.game_instance = TicTacToe(settings)
+            self.game_instance._enter_move([2, 2], 'X')
+            self.game_instance.nodes_visited = 0
+            cached_move = self.game_instance._get_ai_move()
+            self.game_instance.close()
+        assert self.game_instance.nodes_visited == 0, 'Cached move should be played without search'
+        assert cached_move == (2 - move[0], 2 - move[1]), 'Move should be rotated like the position'
+
+    def test_search_stats(self):
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._get_best_move_coordinates()
+        assert self.game_instance.stats is None, 'Statistics should not be collected unless asked'
+
+        self.game_instance = TicTacToe(GameSettings(stats=True, quiet=True))
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._get_best_move_coordinates()
+        stats = self.game_instance.stats
+        assert stats.nodes == self.game_instance.nodes_visited and min(stats.nodes_by_depth) == 2
+        assert stats.cutoffs > 0 and stats.cache_probes > 0 and stats.elapsed > 0
+
+    def test_search_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.jsonl')
+            self.game_instance = TicTacToe(GameSettings(trace=path, quiet=True, search='minimax'))
+            for n, m, marker in ((0, 0, 'X'), (1, 1, 'O'), (2, 2, 'X'), (0, 2, 'O'), (2, 0, 'X')):
+                self.game_instance._enter_move([n, m], marker)
+            move = self.game_instance._get_best_move_coordinates()
+            self.game_instance.close()
+            with open(path) as trace_file:
+                records = [json.loads(line) for line in trace_file]
+        assert records[0]['board'][0] == ['X', ' ', 'O'] and records[-1]['best_move'] == list(move)
+        positions = records[1:-1]
+        assert len(positions) == self.game_instance.nodes_visited
+        assert sorted(tuple(record['move']) for record in positions if record['depth'] == 2) == \
+            [(0, 1), (1, 0), (1, 2), (2, 1)], 'Every root move should be traced'
+
+    def test_iterative_deepening_solves_small_board(self):
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._enter_move([1, 1], 'O')
+        self.game_instance._enter_move([2, 1], 'X')
+        full_scores = self.game_instance._alphabeta_search_impl(1, True)
+
+        self.game_instance.transposition_table.clear()
+        self.game_instance.think_ms = 1000
+        deepening_scores = self.game_instance._iterative_deepening_search()
+        assert max(full_scores) == max(deepening_scores), 'Search should reach end of game within time budget'
+        assert self.game_instance.max_depth == 6, 'Depth limit should be restored after search'
+
+    def test_iterative_deepening_depth_limit(self):
+        self.game_instance = TicTacToe(GameSettings(size=7, think_ms=5000, max_depth=2, stats=True, quiet=True))
+        self.game_instance._enter_move([3, 3], 'X')
+        self.game_instance._get_best_move_coordinates()
+        assert max(self.game_instance.stats.iteration_times) == 2, 'Search should not deepen past --depth'
+
+    def test_iterative_deepening_time_budget(self):
+        self.game_instance.grid_width = 7
+        self.game_instance.think_ms = 50
+        self.game_instance.reset_board()
+        self.game_instance._enter_move([3, 3], 'X')
+        search_start = perf_counter()
+        move = self.game_instance._get_best_move_coordinates()
+        assert perf_counter() - search_start < 0.5, 'Search should stop when time budget runs out'
+        assert self.game_instance._is_allowed_move(move, True)
+
+    def test_parallel_search_matches_sequential(self):
+        self.game_instance._enter_move([0, 0], 'X')
+        self.game_instance._enter_move([1, 1], 'O')
+        self.game_instance._enter_move([2, 1], 'X')
+        sequential_scores = self.game_instance._alphabeta_search_impl(1, True)
+
+        self.game_instance.workers = 2
+        try:
+            parallel_scores = self.game_instance._parallel_search_impl()
+        finally:
+            self.game_instance._executor.shutdown()
+        best_score = max(score for score, _ in sequential_scores)
+        assert best_score == max(score for score, _ in parallel_scores)
+        assert sorted(move for score, move in sequential_scores if score == best_score) == \
+            sorted(move for score, move in parallel_scores if score == best_score)
+        assert self.game_instance.marker_places[2][2] == ' ', 'Workers should not change the board'
+
+    def test_parallel_search_keeps_node_count(self):
+        game = TicTacToe(GameSettings(size=4, quiet=True))
+        for move, marker in (([0, 0], 'X'), ([1, 1], 'O'), ([2, 1], 'X')):
+            game._enter_move(move, marker)
+        game._alphabeta_search_impl(1, True)
+        sequential_nodes = game.nodes_visited
+
+        game.transposition_table.clear()
+        game.nodes_visited = 0
+        game.workers = 2
+        try:
+            game._parallel_search_impl()
+        finally:
+            game.close()
+        assert game.nodes_visited < 1.5 * sequential_nodes, \
+            f'Workers should search with the root window: {game.nodes_visited} vs {sequential_nodes} positions'
+
+    def test_parallel_search_stats(self):
+        game = TicTacToe(GameSettings(quiet=True, stats=True, workers=2))
+        game._enter_move([0, 0], 'X')
+        try:
+            game._get_best_move_coordinates()
+        finally:
+            game.close()
+        assert game.stats.nodes == game.nodes_visited > 0, 'Positions of every worker should be counted once'
+
+    def test_book_move(self):
+        table_path = os.path.join(tempfile.mkdtemp(), 'ttt3.book')
+        generator = TableBaseGenerator(3)
+        generator.solve()
+        generator.write(table_path)
+        self.game_instance.book = TableBase(table_path)
+        try:
+            self.game_instance._enter_move([0, 0], 'X')
+            self.game_instance._enter_move([1, 1], 'O')
+            self.game_instance._enter_move([0, 1], 'X')
+            assert self.game_instance._get_ai_move() == (0, 2), 'Book move should block the row'
+        finally:
+            self.game_instance.book.close()
+            os.remove(table_path)
+
+    def test_book_move_for_x(self):
+        table_path = os.path.join(tempfile.mkdtemp(), 'ttt3.book')
+        generator = TableBaseGenerator(3)
+        generator.solve()
+        generator.write(table_path)
+        self.game_instance.book = TableBase(table_path)
+        try:
+            for move, marker in (([0, 0], 'X'), ([1, 0], 'O'), ([0, 1], 'X'), ([1, 1], 'O')):
+                self.game_instance._enter_move(move, marker)
+            assert self.game_instance.get_ai_move('X') == (0, 2), 'Book move should win the row for X'
+            assert self.game_instance.marker_places[1][:2] == ['O', 'O'], 'Markers should be restored'
+        finally:
+            self.game_instance.book.close()
+            os.remove(table_path)
+
+    def test_symmetric_openings_grouped(self):
+        moves = self.game_instance._get_ordered_moves(True)
+        groups = self.game_instance._group_symmetric_moves(moves, 'O')
+        assert len(groups) == 3, 'Empty 3x3 board should have only center, corner and edge openings'
+        assert sorted(len(group) for group in groups) == [1, 4, 4]
     # endregion
 
     # region Graphics
@@ -98,6 +441,22 @@ class TTTUnit(TestCase):
                 f'but got {board_row_length} and {len(board_lines)}'
             )
 
+    def test_large_table_graphics(self):
+        self.game_instance = TicTacToe(GameSettings(size=12))
+        self.game_instance._enter_move([1, 11], 'X')
+        self.game_instance._enter_move([11, 1], 'O')
+        board_lines = self.game_instance._draw_board_impl().split('\n')
+        assert board_lines[3].endswith('| X|') and board_lines[3].count('X') == 1
+        assert board_lines[23].startswith('|  | O|') and board_lines[23].count('O') == 1
+
+    def test_unchanged_rows_not_redrawn(self):
+        first_lines = self.game_instance._draw_board_impl().split('\n')
+        row_lines = list(self.game_instance._board_lines)
+        self.game_instance._enter_move([1, 2], 'X')
+        second_lines = self.game_instance._draw_board_impl().split('\n')
+        changed = [n for n, line in enumerate(self.game_instance._board_lines) if line is not row_lines[n]]
+        assert changed == [3] and second_lines[3] == '|  |  | X|' and first_lines[1] == second_lines[1]
+
     def test_get_filled_table_graphics(self):
         board = self.game_instance._draw_board_impl()
 
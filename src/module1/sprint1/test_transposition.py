@@ -0,0 +1,61 @@
+"""
+Unit tests for transposition table and Zobrist hashing
+"""
+__author__ = "Markus Juuti"
+
+
+from transposition import EXACT, LOWER_BOUND, TranspositionTable, ZobristHasher
+from unittest import TestCase
+
+
+class TranspositionUnit(TestCase):
+
+    def test_incremental_hash_matches_full_hash(self):
+        hasher = ZobristHasher(3)
+        board = [[' '] * 3 for _ in range(3)]
+        board[0][0] = 'X'
+        board[1][2] = 'O'
+        board_hash = hasher.get_key(0, 0, 'X') ^ hasher.get_key(1, 2, 'O')
+        assert hasher.get_hash(board) == board_hash, 'Hash should be XOR of occupied cell keys'
+
+    def test_hash_is_reproducible(self):
+        assert ZobristHasher(4).keys == ZobristHasher(4).keys, 'Same board size should give same keys'
+
+    def test_symmetric_positions_share_canonical_hash(self):
+        hasher = ZobristHasher(3)
+        board = [[' '] * 3 for _ in range(3)]
+        board[0][1] = 'X'
+        board[2][2] = 'O'
+        rotated = [[' '] * 3 for _ in range(3)]
+        rotated[1][2] = 'X'
+        rotated[2][0] = 'O'
+        board_hash, symmetry = hasher.get_canonical(hasher.get_hashes(board))
+        rotated_hash, rotated_symmetry = hasher.get_canonical(hasher.get_hashes(rotated))
+        assert board_hash == rotated_hash, 'Rotated position should have same canonical hash'
+
+        canonical_move = hasher.transform_move((0, 0), symmetry)
+        assert hasher.restore_move(canonical_move, symmetry) == (0, 0)
+        assert hasher.restore_move(canonical_move, rotated_symmetry) == (0, 2), \
+            'Move should map to the same cell of the rotated board'
+
+    def test_store_and_get(self):
+        table = TranspositionTable(10)
+        table.store(123, 1.5, 4, EXACT, (1, 1))
+        assert table.get(123) == (1.5, 4, EXACT, (1, 1))
+        assert table.get(456) is None
+        assert table.hits == 1
+
+    def test_least_recently_used_evicted(self):
+        table = TranspositionTable(2)
+        table.store(1, 0, 1, EXACT, None)
+        table.store(2, 0, 1, LOWER_BOUND, None)
+        table.get(1)
+        table.store(3, 0, 1, EXACT, None)
+        assert len(table) == 2
+        assert table.get(2) is None, 'Least recently used entry should be evicted first'
+        assert table.get(1) is not None and table.get(3) is not None
+
+    def test_zero_size_disables_table(self):
+        table = TranspositionTable(0)
+        table.store(1, 0, 1, EXACT, None)
+        assert len(table) == 0
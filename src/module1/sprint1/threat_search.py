@@ -0,0 +1,212 @@
+"""
+Threat-space search AI for k-in-a-row (gomoku style) TicTacToe games on large boards
+
+:author: @mjuuti
+"""
+from bitboard import BitBoard
+
+
+class ThreatSpaceSearch:
+    """
+    Fast AI for large boards. Only cells near markers already on the board are considered.
+    Immediate wins and blocks are played first, then forced wins by fours (each move leaving a
+    single cell the opponent must block) and open threes (each move leaving open fours, which the
+    opponent must block before they are made) are searched for both players, and otherwise the
+    cell taking part in the most promising lines of both players is chosen
+    """
+
+    board = None  # type: BitBoard
+    max_threat_depth = 8
+    max_nodes = 5000
+    neighbourhood = 2
+    nodes_visited = 0
+
+    def __init__(self, board: BitBoard):
+        self.board = board
+
+    def get_move(self, marker: str) -> int:
+        """
+        Get move for the player in turn
+        :param marker: player's marker (X or O)
+        :return: bit index of the cell to play
+        """
+        opponent = 'X' if marker == 'O' else 'O'
+        self.nodes_visited = 0
+        candidates = self.get_candidates()
+        if not self.board.x_mask | self.board.o_mask:
+            return candidates[0]
+
+        for player in (marker, opponent):
+            wins = self.get_winning_cells(player)
+            if wins:
+                # own win, or the opponent's win which must be blocked
+                return min(wins)
+
+        for attacker, defender in ((marker, opponent), (opponent, marker)):
+            threat_move = self._find_forced_win(attacker, defender, self.max_threat_depth)
+            if threat_move is not None:
+                # start own forced win, or take the key cell of the opponent's
+                return threat_move
+
+        return max(candidates, key=lambda index: self._get_cell_score(index, marker, opponent))
+
+    def get_candidates(self) -> list:
+        """
+        Get free cells within neighbourhood distance of any marker on the board, ordered from
+        the center outwards. Center cell only on empty board
+        :return: list of bit indices
+        """
+        center = (self.board.grid_width - 1) / 2
+        if not self.board.x_mask | self.board.o_mask:
+            cells = self.board.get_free_cells()
+        else:
+            cells = self.board.get_cells(self.board.get_neighbourhood(self.neighbourhood))
+        return sorted(cells, key=lambda index: sum(abs(c - center) for c in self.board.get_coordinates(index)))
+
+    def get_winning_cells(self, marker: str) -> set:
+        """
+        Get free cells which would complete a line for the player
+        :param marker: player's marker (X or O)
+        :return: set of bit indices
+        """
+        own = self.board.get_mask(marker)
+        other = self.board.get_mask('X' if marker == 'O' else 'O')
+        return {(line & ~own).bit_length() - 1 for line in self.board.line_masks
+                if not line & other and (own & line).bit_count() == self.board.win_length - 1}
+
+    def _get_four_moves(self, own: int, other: int) -> list:
+        """
+        Get free cells which would leave the player one marker short of a full line
+        :param own: mask of player's markers
+        :param other: mask of opponent's markers
+        :return: list of bit indices
+        """
+        return self._get_line_moves(own, other, 2)
+
+    def _get_three_moves(self, own: int, other: int) -> list:
+        """
+        Get free cells which would leave the player two markers short of a full line
+        :param own: mask of player's markers
+        :param other: mask of opponent's markers
+        :return: list of bit indices
+        """
+        return self._get_line_moves(own, other, 3)
+
+    def _get_line_moves(self, own: int, other: int, missing: int) -> list:
+        """
+        Get free cells on lines still open for the player, which are the given number of markers short
+        :param own: mask of player's markers
+        :param other: mask of opponent's markers
+        :param missing: number of free cells on the lines
+        :return: list of bit indices
+        """
+        cells = set()
+        for line in self.board.line_masks:
+            if not line & other and (own & line).bit_count() == self.board.win_length - missing:
+                cells.update(self.board.get_cells(line & ~own))
+        return sorted(cells)
+
+    def _get_open_four_moves(self, own: int, other: int) -> dict:
+        """
+        Get moves which would complete two lines at once, like an open four, so that the
+        opponent cannot block both
+        :param own: mask of player's markers
+        :param other: mask of opponent's markers
+        :return: dictionary of bit index -> set of cells completing a line after it
+        """
+        threats = dict()
+        for index in self._get_four_moves(own, other):
+            gaps = self._get_gaps(index, own | 1 << index, other)
+            if len(gaps) > 1:
+                threats[index] = gaps
+        return threats
+
+    def _get_gaps(self, index: int, own: int, other: int) -> set:
+        """
+        Get cells completing a line for the player through the given cell
+        :param index: bit index of the cell
+        :param own: mask of player's markers
+        :param other: mask of opponent's markers
+        :return: set of bit indices
+        """
+        return {(line & ~own).bit_length() - 1 for line in self.board.cell_line_masks[index]
+                if not line & other and (own & line).bit_count() == self.board.win_length - 1}
+
+    def _find_forced_win(self, attacker: str, defender: str, depth: int):
+        """
+        Search for a sequence of fours and open threes which wins regardless of how the defender
+        blocks. Lines where the defender's block makes a four of their own are given up, and
+        threes are not tried while the defender could answer them with a four
+        :param attacker: marker of the player searching for a win
+        :param defender: marker of the other player
+        :param depth: maximum number of attacker's moves
+        :return: bit index of the first move of the winning sequence, or None
+        """
+        if depth == 0 or self.nodes_visited > self.max_nodes:
+            return None
+
+        for index in self._get_four_moves(self.board.get_mask(attacker), self.board.get_mask(defender)):
+            self.nodes_visited += 1
+            self.board.place(index, attacker)
+            gaps = self._get_gaps(index, self.board.get_mask(attacker), self.board.get_mask(defender))
+            found = len(gaps) > 1
+            if len(gaps) == 1:
+                block = gaps.pop()
+                self.board.place(block, defender)
+                counter_threat = self._get_gaps(block, self.board.get_mask(defender),
+                                                self.board.get_mask(attacker))
+                if not counter_threat:
+                    found = self._find_forced_win(attacker, defender, depth - 1) is not None
+                self.board.remove(block)
+            self.board.remove(index)
+            if found:
+                return index
+
+        if self._get_four_moves(self.board.get_mask(defender), self.board.get_mask(attacker)):
+            return None
+        threes = list()
+        for index in self._get_three_moves(self.board.get_mask(attacker), self.board.get_mask(defender)):
+            self.nodes_visited += 1
+            self.board.place(index, attacker)
+            threats = self._get_open_four_moves(self.board.get_mask(attacker), self.board.get_mask(defender))
+            self.board.remove(index)
+            if threats:
+                # reply missing the cells of any open four leaves that one to be made, so only
+                # cells shared by all of them can stop the three
+                threes.append((set.intersection(*({move} | gaps for move, gaps in threats.items())), index))
+
+        # threes with fewest replies first, those with none win right away
+        for blocks, index in sorted(threes, key=lambda three: (len(three[0]), three[1])):
+            self.board.place(index, attacker)
+            found = True
+            for block in sorted(blocks):
+                self.nodes_visited += 1
+                self.board.place(block, defender)
+                found = not self._get_gaps(block, self.board.get_mask(defender), self.board.get_mask(attacker)) \
+                    and self._find_forced_win(attacker, defender, depth - 1) is not None
+                self.board.remove(block)
+                if not found:
+                    break
+            self.board.remove(index)
+            if found:
+                return index
+        return None
+
+    def _get_cell_score(self, index: int, marker: str, opponent: str) -> int:
+        """
+        Score a cell by lines going through it: lines still open for the player are worth more
+        the more markers they have, and lines of the opponent are worth blocking the same way
+        :param index: bit index of the cell
+        :param marker: player's marker (X or O)
+        :param opponent: opponent's marker
+        :return: integer score
+        """
+        own = self.board.get_mask(marker)
+        other = self.board.get_mask(opponent)
+        score = 0
+        for line in self.board.cell_line_masks[index]:
+            if not line & other:
+                score += 10 ** (own & line).bit_count() * 2
+            if not line & own:
+                score += 10 ** (other & line).bit_count()
+        return score
@@ -3,46 +3,248 @@ tic-tac-toe implementation with python
 
 :author: @mjuuti
 """
+import json
 import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from math import copysign, inf
 from argparse import ArgumentParser
 from datetime import datetime
-from logging import getLogger
+from logging import DEBUG, getLogger
+from time import perf_counter
+from typing import TextIO
+
+from bitboard import BitBoard
+from evaluation import HEURISTIC_LIMIT, Evaluator, get_evaluator
+from mcts import MonteCarloTreeSearch
+from position_cache import PositionCache
+from search_stats import SearchStats
+from tablebase import TableBase
+from threat_search import ThreatSpaceSearch
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable, ZobristHasher
 
 log = getLogger('TicTacToe')
 
 
-def get_arguments():
+def _evaluate_root_moves(game: 'TicTacToe', moves: list, alpha: float = -inf,
+                         transposition_table: TranspositionTable = None) -> tuple:
+    """
+    Score root moves in a worker process, on the worker's own copy of the game. Like the root of
+    alpha-beta search, the window is kept open just below the best score found so far
+    :param game: pickled copy of the game with AI in turn
+    :param moves: list of (x, y) tuples to score
+    :param alpha: lower end of the window, from scores of moves searched before
+    :param transposition_table: table to search with, instead of the copy's empty one
+    :return: tuple(list of (score, move) tuples, number of positions visited, SearchStats or None)
+    """
+    if transposition_table is not None:
+        game.transposition_table = transposition_table
+    nodes_visited = game.nodes_visited
+    scores = list()
+    for n, m in moves:
+        game._place_marker(n, m, 'O')
+        if game.search_mode == 'minimax':
+            score = game._minimax_algo_score(2, True, (n, m, 'O'))
+        else:
+            score = game._alphabeta_algo_score(2, True, alpha, inf, (n, m, 'O'))
+            alpha = max(alpha, score - game._tie_margin)
+        game._remove_marker(n, m)
+        scores.append((score, (n, m)))
+    return scores, game.nodes_visited - nodes_visited, game.stats
+
+
+def get_arguments(argv: list = None):
     """
     Command-line argument parser for the program. Just to allow 2-player mode and larger boards,
     as well as unit tests
+    :param argv: arguments to parse instead of sys.argv
     :return:
     """
     parser = ArgumentParser('TicTacToe')
     parser.add_argument('--size', type=int, help='Game grid width', default=3)
+    parser.add_argument('--win-length', type=int, help='Markers in a row needed to win (default: grid width)')
     parser.add_argument('--players', type=int, help='Number of players (1 or 2)',
                         default=1, nargs='?', const=1, choices=[1, 2])
     parser.add_argument('--dumb', action="store_false", dest='smart', help="AI will play smarter. Max grid size 3x3")
-    return parser.parse_known_args()[0]
+    parser.add_argument('--search', choices=['alphabeta', 'minimax', 'threat', 'mcts'], default='alphabeta',
+                        help='AI search algorithm: pruned alpha-beta, exhaustive minimax, threat-space '
+                             'search for large boards with --win-length or Monte Carlo tree search. '
+                             'Alpha-beta and minimax without --think-ms fall back to Monte Carlo tree '
+                             'search on boards wider than 5')
+    parser.add_argument('--depth', type=int, default=6, dest='max_depth',
+                        help='Maximum search depth of minimax and alpha-beta search, also with --think-ms')
+    parser.add_argument('--eval', choices=['lines', 'none'], default='lines', dest='evaluation',
+                        help='Evaluation of unfinished positions where minimax and alpha-beta search reach '
+                             'the depth limit: open lines weighted by markers on them, or none (draw)')
+    parser.add_argument('--think-ms', type=int,
+                        help='Time budget for an AI move in milliseconds. Alpha-beta search deepens '
+                             'iteratively up to --depth and plays the best move found when time runs out. '
+                             'Not supported with --search minimax or --workers')
+    parser.add_argument('--playouts', type=int,
+                        help='Number of random games Monte Carlo tree search plays per AI move '
+                             '(default: 1000, or unlimited within --think-ms)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes scoring root moves of minimax and alpha-beta search '
+                             'without --think-ms')
+    parser.add_argument('--book', help='Tablebase file made with tablebase.py for perfect-play AI moves')
+    parser.add_argument('--cache', help='SQLite file of AI moves shared between games and processes, '
+                                        'created if it does not exist')
+    parser.add_argument('--cache-size', type=int, default=10 ** 5,
+                        help='Maximum number of moves kept in the --cache file')
+    parser.add_argument('--tt-size', type=int, default=2 ** 18,
+                        help='Maximum number of positions alpha-beta search caches between turns (0 disables)')
+    parser.add_argument('--board', choices=['list', 'bitboard'], default='list', dest='board_backend',
+                        help='Board state representation used for win checks and AI search')
+    parser.add_argument('--quiet', action='store_true', help='Do not print AI moves and game results')
+    parser.add_argument('--stats', action='store_true',
+                        help='Collect and print node counts, cutoffs and cache hits of minimax and alpha-beta search')
+    parser.add_argument('--trace', help='File to write every position scored by minimax and alpha-beta search to, '
+                                        'as JSON lines')
+    args = parser.parse_known_args(argv)[0]
+    if args.think_ms and args.search == 'minimax':
+        parser.error('--think-ms is not supported with --search minimax')
+    if args.think_ms and args.workers > 1:
+        parser.error('--think-ms and --workers cannot be used together')
+    return args
+
+
+def get_winning_lines(grid_width: int, win_length: int = None) -> list:
+    """
+    Get all lines on the board which win the game when claimed by a single player
+    :param grid_width: width (and height) of the board
+    :param win_length: number of markers in a row needed to win, by default full row of grid_width
+    :return: list of tuples of (x, y) coordinates; rows, columns, down and up diagonals
+    """
+    win_length = win_length or grid_width
+    lines = list()
+    for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for x in range(grid_width):
+            for y in range(grid_width):
+                end_x, end_y = x + dx * (win_length - 1), y + dy * (win_length - 1)
+                if end_x not in range(grid_width) or end_y not in range(grid_width):
+                    continue
+                lines.append(tuple((x + dx * n, y + dy * n) for n in range(win_length)))
+    return lines
+
+
+@dataclass(frozen=True)
+class GameSettings:
+    """
+    Game configuration, parsed once from the command-line or given directly when the game is
+    used as a library. Defaults match the command-line defaults
+    """
+
+    size: int = 3
+    win_length: int = None
+    players: int = 1
+    smart: bool = True
+    search: str = 'alphabeta'
+    max_depth: int = 6
+    evaluation: str = 'lines'
+    think_ms: int = None
+    playouts: int = None
+    workers: int = 1
+    book: str = None
+    cache: str = None
+    cache_size: int = 10 ** 5
+    tt_size: int = 2 ** 18
+    board_backend: str = 'list'
+    quiet: bool = False
+    stats: bool = False
+    trace: str = None
+
+    @classmethod
+    def from_arguments(cls, argv: list = None):
+        """
+        Create settings from command-line arguments
+        :param argv: arguments to parse instead of sys.argv
+        :return: GameSettings instance
+        """
+        return cls(**vars(get_arguments(argv)))
 
 
 class TicTacToe:
 
     _grid_width = None  # type: int
+    _win_length = None  # type: int
     marker_places = None  # type: list
     terminated = False
     winner = None  # type: str
     players = None  # type: int
-    _board_template = None  # type: str
+    settings = None  # type: GameSettings
+    _board_lines = None  # type: list
+    _drawn_rows = None  # type: list
     placeholder = ' '
-    ai_max_grid = 8
+    ai_max_grid = 5
+    search_mode = 'alphabeta'
+    nodes_visited = 0
+    max_depth = 6
+    think_ms = None  # type: int
+    playouts = None  # type: int
+    workers = 1
+    book = None  # type: TableBase
+    position_cache = None  # type: PositionCache
+    transposition_table = None  # type: TranspositionTable
+    board_backend = 'list'
+    bitboard = None  # type: BitBoard
+    evaluator = None  # type: Evaluator
+    quiet = False
+    stats = None  # type: SearchStats
+    _trace_file = None  # type: TextIO
+    _ai_marker = 'O'
+    _markers_swapped = False
+    _tie_margin = 1e-9
+    _lines = None  # type: list
+    _cell_lines = None  # type: dict
+    _line_counts = None  # type: dict
+    _line_length = None  # type: int
+    _move_count = 0
+    _free_cells = None  # type: list
+    _free_cell_index = None  # type: dict
+    _last_move = None  # type: tuple
+    _hasher = None  # type: ZobristHasher
+    _board_hashes = None  # type: list
+    _horizon_hit = False
+    _deadline = None  # type: float
+    _timed_out = False
+    _executor = None  # type: ProcessPoolExecutor
+    _mcts = None  # type: MonteCarloTreeSearch
 
-    def __init__(self):
-        args = get_arguments()
-        self.players = args.players
-        self.grid_width = args.size
+    def __init__(self, settings: GameSettings = None):
+        self.settings = settings or GameSettings()
+        self.players = self.settings.players
+        self.grid_width = self.settings.size
+        self.win_length = self.settings.win_length
+        self.search_mode = self.settings.search
+        self.max_depth = self.settings.max_depth
+        self.think_ms = self.settings.think_ms
+        self.playouts = self.settings.playouts
+        self.workers = self.settings.workers
+        self.book = self._open_book()
+        self.position_cache = self._open_position_cache()
+        self.board_backend = self.settings.board_backend
+        self.quiet = self.settings.quiet
+        self.transposition_table = TranspositionTable(self.settings.tt_size)
+        self._trace_file = open(self.settings.trace, 'w') if self.settings.trace else None
         self.reset_board()
 
+    def __getstate__(self):
+        """
+        Copy of the game sent to worker processes leaves out the process pool and cached positions,
+        and counts search statistics from zero, as they are merged back to this game's
+        :return: dictionary of instance attributes
+        """
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_trace_file'] = None
+        state['_mcts'] = None
+        state['book'] = None
+        state['position_cache'] = None
+        state['transposition_table'] = TranspositionTable(self.transposition_table.max_size)
+        state['stats'] = SearchStats() if self.stats is not None else None
+        return state
+
     # region Properties
     @property
     def grid_width(self):
@@ -56,9 +258,23 @@ class TicTacToe:
         :return: None
         """
         if value < 3 or value > 15:
-            print("Grid size must be between 3 and 15")
-            sys.exit(1)
+            raise ValueError("Grid size must be between 3 and 15")
         self._grid_width = value
+
+    @property
+    def win_length(self):
+        return self._win_length or self.grid_width
+
+    @win_length.setter
+    def win_length(self, value: int):
+        """
+        Setter for number of markers in a row needed to win, with input validation
+        :param value: integer value between 3 and grid width, or None for full row
+        :return: None
+        """
+        if value is not None and (value < 3 or value > self.grid_width):
+            raise ValueError(f"Win length must be between 3 and {self.grid_width}")
+        self._win_length = value
     # endregion
 
     # region High level methods
@@ -76,6 +292,25 @@ class TicTacToe:
                 break
             self.get_player_move(1 + turn % 2)
             turn += 1
+        self.close()
+
+    def close(self):
+        """
+        Release the worker processes, the trace file and the opened files of moves, if any
+        :return: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._trace_file is not None:
+            self._trace_file.close()
+            self._trace_file = None
+        if self.position_cache is not None:
+            self.position_cache.close()
+            self.position_cache = None
+        if self.book is not None:
+            self.book.close()
+            self.book = None
 
     def reset_board(self):
         """
@@ -84,9 +319,30 @@ class TicTacToe:
         """
         self.marker_places = list()
         self.terminated = False
+        self.winner = None
         for _ in range(self.grid_width):
             self.marker_places.append([" "] * self.grid_width)
 
+        # indices of winning lines going through each cell, and number of markers each player has
+        # on every line, so that wins and threats can be spotted from a single cell
+        lines = get_winning_lines(self.grid_width, self.win_length)
+        self._lines = lines
+        self._line_length = self.win_length
+        self._cell_lines = dict()
+        for index, line in enumerate(lines):
+            for cell in line:
+                self._cell_lines.setdefault(cell, list()).append(index)
+        self._line_counts = {'X': [0] * len(lines), 'O': [0] * len(lines)}
+        self._last_move = None
+
+        self.bitboard = BitBoard(self.grid_width, self.win_length) if self.board_backend == 'bitboard' else None
+        self.evaluator = get_evaluator(self.settings.evaluation, lines, self.win_length)
+        self._hasher = ZobristHasher(self.grid_width)
+        self._sync_search_state()
+        self._mcts = None
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+
     def draw_board(self):
         """
         Draw game board with current state to console out
@@ -94,7 +350,7 @@ class TicTacToe:
         """
         if self.terminated:
             return
-        print(self._draw_board_impl())
+        sys.stdout.write(self._draw_board_impl() + '\n')
 
     def check_game_end_condition(self):
         """
@@ -104,12 +360,15 @@ class TicTacToe:
         if self.terminated:
             return
 
-        if self._check_win_condition_impl():
-            print(f"\nGame Over - {self.winner} wins!")
+        if self._last_move is not None and self._is_line_completed(*self._last_move):
+            self.winner = self._last_move[2]
+            if not self.quiet:
+                print(f"\nGame Over - {self.winner} wins!")
             self.terminated = True
 
-        elif self._is_table_full():
-            print("\nGame Over - Stalemate")
+        elif self._move_count == self.grid_width * self.grid_width:
+            if not self.quiet:
+                print("\nGame Over - Stalemate")
             self.terminated = True
 
     def get_player_move(self, player_num: int):
@@ -130,38 +389,23 @@ class TicTacToe:
     # endregion
 
     # region graphics
-    def _get_board_template(self):
-        """
-        Getter for board template to prevent it being created every time before filling
-        :return:
-        """
-        if self._board_template is None:
-            board_lines = list()
-
-            # print board ascii string with cells filled with coordinates and with +--+--+ border
-            border = f'{"+--" * self.grid_width}+'
-            board_lines.append(border)
-            for xn in range(self.grid_width):
-                xline = str()
-                for yn in range(self.grid_width):
-                    xline += f'|{xn}{yn}'
-                board_lines.append(xline + '|')
-                board_lines.append(border)
-            self._board_template = '\n'.join(board_lines)
-        return self._board_template
-
     def _draw_board_impl(self):
         """
-        Implementation of board graphics builder
+        Implementation of board graphics builder. Lines of the board are kept between calls and
+        only rows whose markers have changed are rendered again
         :return: String representing the game board state
         """
-        board = self._get_board_template()
-        for x in range(self.grid_width):
-            for y in range(self.grid_width):
-                board = board.replace(
-                    f'|{x}{y}|',
-                    f'| {self.marker_places[x][y]}|')
-        return board
+        if self._board_lines is None or len(self._drawn_rows) != self.grid_width:
+            # cells are +--+--+ bordered, rows at odd line numbers
+            border = f'{"+--" * self.grid_width}+'
+            self._board_lines = [border] * (2 * self.grid_width + 1)
+            self._drawn_rows = [None] * self.grid_width
+
+        for x, row in enumerate(self.marker_places):
+            if self._drawn_rows[x] != row:
+                self._drawn_rows[x] = row.copy()
+                self._board_lines[2 * x + 1] = f'| {"| ".join(row)}|'
+        return '\n'.join(self._board_lines)
     # endregion
 
     # region Game results
@@ -172,10 +416,21 @@ class TicTacToe:
         """
         if player:
             player = player.upper()
+        if self.bitboard is not None:
+            if player:
+                return self.bitboard.has_won(player)
+            self.winner = self.bitboard.get_winner()
+            return self.winner is not None
+        if self.win_length < self.grid_width:
+            return self._check_line_win_condition(player)
+
+        # lines are formatted only when debug logging is on, as this runs for every search node
+        debug = log.isEnabledFor(DEBUG)
         for n in range(self.grid_width):
             # x-axis
             row = self.marker_places[n]
-            log.debug(f'row {n}: {row}')
+            if debug:
+                log.debug('row %d: %s', n, row)
             if self._is_same_value(row):
                 if not player:
                     self.winner = row[0]
@@ -183,8 +438,9 @@ class TicTacToe:
                 return row[0] == player
 
             # y-axis
-            column = list(zip(*self.marker_places))[n]
-            log.debug(f'column {n}: {column}')
+            column = [row[n] for row in self.marker_places]
+            if debug:
+                log.debug('column %d: %s', n, column)
             if self._is_same_value(column):
                 if not player:
                     self.winner = column[0]
@@ -193,23 +449,110 @@ class TicTacToe:
 
         # diagonals
         down_diagonal = [self.marker_places[n][n] for n in range(self.grid_width)]
-        log.debug(f'down diag: {down_diagonal}')
+        if debug:
+            log.debug('down diag: %s', down_diagonal)
         if self._is_same_value(down_diagonal):
             if not player:
                 self.winner = self.marker_places[0][0]
                 return True
             return self.marker_places[0][0] == player
 
-        up_diagonal = [list(zip(*self.marker_places))[::-1][n][n] for n in range(self.grid_width)]
-        log.debug(f'up diag: {up_diagonal}')
+        up_diagonal = [self.marker_places[n][self.grid_width - 1 - n] for n in range(self.grid_width)]
+        if debug:
+            log.debug('up diag: %s', up_diagonal)
         if self._is_same_value(up_diagonal):
             if not player:
-                self.winner = list(zip(*self.marker_places))[::-1][0][0]
+                self.winner = up_diagonal[0]
                 return True
-            return list(zip(*self.marker_places))[::-1][0][0] == player
+            return up_diagonal[0] == player
+
+        return False
 
+    def _check_line_win_condition(self, player: str = None) -> bool:
+        """
+        Check if either player has claimed win_length markers in a row anywhere on the board
+        :param player: check only for this player's win
+        :return: boolean if game has finished to a win
+        """
+        for line in self._lines:
+            values = [self.marker_places[x][y] for x, y in line]
+            if self._is_same_value(values):
+                if not player:
+                    self.winner = values[0]
+                    return True
+                if values[0] == player:
+                    return True
         return False
 
+    # region Engine API
+    def get_legal_moves(self) -> list:
+        """
+        Get all cells where the player in turn can place a marker
+        :return: list of (x, y) tuples, empty when game has ended
+        """
+        if self.terminated:
+            return list()
+        return list(self._free_cells)
+
+    def apply_move(self, coordinates: list, marker: str):
+        """
+        Place marker to the board without console input, and check if the move ended the game
+        :param coordinates: list or tuple of integers representing board coordinates
+        :param marker: player's marker (X or O)
+        :return: None
+        """
+        if self.terminated:
+            raise ValueError('Game has already ended')
+        if not self._is_allowed_move(coordinates, True):
+            raise ValueError(f'Move {coordinates} is not allowed')
+        self._enter_move(coordinates, marker)
+        self.check_game_end_condition()
+
+    def get_result(self):
+        """
+        Get result of the game
+        :return: winner's marker, 'draw' for stalemate or None if game has not ended
+        """
+        if not self.terminated:
+            return None
+        return self.winner or 'draw'
+
+    def get_ai_move(self, marker: str = 'O') -> list:
+        """
+        Get AI move for either player. Search always plays O, so for X the markers on the board are
+        swapped for the duration of the search
+        :param marker: marker of the player in turn
+        :return: list of integers representing coordinates
+        """
+        if marker != self._ai_marker:
+            # positions cached for the other side would be scored for the wrong player
+            self._ai_marker = marker
+            self.transposition_table.clear()
+            self._mcts = None
+        if marker == 'O':
+            return self._get_ai_move()
+
+        # tablebase tells the side to move from the real board, so it is looked up before swapping
+        book_move = self._get_book_move() if self.settings.smart else None
+        if book_move is not None and self._is_allowed_move(book_move, True):
+            return book_move
+        self._swap_markers()
+        try:
+            return self._get_ai_move()
+        finally:
+            self._swap_markers()
+
+    def _swap_markers(self):
+        """
+        Swap X and O markers on the board
+        :return: None
+        """
+        swapped = {'X': 'O', 'O': 'X'}
+        self.marker_places = [[swapped.get(marker, marker) for marker in row] for row in self.marker_places]
+        self._markers_swapped = not self._markers_swapped
+        self._sync_search_state()
+    # endregion
+
     # region player moves
     def _enter_move(self, coordinates: list, character: str):
         """
@@ -218,7 +561,17 @@ class TicTacToe:
         :param character: player's marker (X or O)
         :return: None
         """
-        self.marker_places[coordinates[0]][coordinates[1]] = character
+        self._place_marker(coordinates[0], coordinates[1], character)
+        self._last_move = (coordinates[0], coordinates[1], character)
+
+        # swap cell out of free cells list with the last one, to remove it in constant time
+        cell = (coordinates[0], coordinates[1])
+        last_cell = self._free_cells.pop()
+        if last_cell != cell:
+            position = self._free_cell_index[cell]
+            self._free_cells[position] = last_cell
+            self._free_cell_index[last_cell] = position
+        del self._free_cell_index[cell]
 
     def _get_coordinates(self, player_num: int) -> list:
         """
@@ -260,7 +613,7 @@ class TicTacToe:
 
     # region AI logic
     def _get_random_coordinates(self):
-        return [random.randint(0, self.grid_width - 1), random.randint(0, self.grid_width - 1)]
+        return list(random.choice(self._free_cells))
 
     def _get_ai_move(self):
         """
@@ -272,28 +625,126 @@ class TicTacToe:
             if attempts > 5000:
                 raise OverflowError("AI did not find coordinates with 5000 attempts")
             attempts += 1
-            if get_arguments().smart:
-                coords = self._get_best_move_coordinates()
+            if self.settings.smart:
+                coords = self._get_book_move() or self._get_cached_move()
+                if coords is None:
+                    coords = self._get_best_move_coordinates()
+                    if self.position_cache is not None:
+                        self.position_cache.store(self._get_cache_rules(), self.marker_places, coords)
             else:
                 coords = self._get_random_coordinates()
             if self._is_allowed_move(coords, True):
                 return coords
 
-    def _minimax_algo_score(self, depth: int, ai_turn: bool) -> float:
+    def _get_terminal_score(self, depth: int, last_move: tuple = None):
+        """
+        Score for a position where the search ends: a win for either player, full board or depth limit
+        :param depth: current depth
+        :param last_move: (x, y, marker) of the move leading to this position. Only lines through it
+            need to be checked for a win, others would have ended the game earlier
+        :return: score as float, or None if search should continue deeper
+        """
+        self.nodes_visited += 1
+        if last_move is None:
+            if self._check_win_condition_impl('X'):
+                return float(-100/depth)
+            elif self._check_win_condition_impl('O'):
+                return float(100/depth)
+            elif self._is_table_full():
+                return 0
+        elif self._is_line_completed(*last_move):
+            return float(100/depth) if last_move[2] == 'O' else float(-100/depth)
+        elif self._move_count == self.grid_width * self.grid_width:
+            return 0
+
+        if depth > self.max_depth:
+            self._horizon_hit = True
+            return self.evaluator.score if self.evaluator is not None else 0
+        return None
+
+    def _get_book_move(self):
+        """
+        Get perfect-play move from the tablebase, if one is loaded for these rules and it has
+        the current position
+        :return: (x, y) tuple or None
+        """
+        if self.settings.book and self.book is None:
+            # copies of the game sent to other processes map the file of their own
+            self.book = self._open_book()
+        if self.book is None or (self.book.grid_width, self.book.win_length) != (self.grid_width, self.win_length):
+            return None
+        if self._markers_swapped:
+            # book move of the swapped board would be for the other side
+            return None
+        entry = self.book.lookup(self.marker_places)
+        if entry is None:
+            return None
+        move, score = entry
+        if not self.quiet:
+            print(f'Book move: {move} with score {score}')
+        return move
+
+    def _open_book(self):
+        """
+        Open the tablebase file, if one is set
+        :return: TableBase instance or None
+        """
+        if not self.settings.book:
+            return None
+        return TableBase(self.settings.book)
+
+    def _open_position_cache(self):
+        """
+        Open the shared move cache, if one is set
+        :return: PositionCache instance or None
+        """
+        if not self.settings.cache:
+            return None
+        return PositionCache(self.settings.cache, self.settings.cache_size)
+
+    def _get_cached_move(self):
+        """
+        Get move searched earlier with the same rules and search settings, by this or any other
+        process using the same cache file
+        :return: (x, y) tuple or None
+        """
+        if self.settings.cache and self.position_cache is None:
+            # copies of the game sent to other processes open a connection of their own
+            self.position_cache = self._open_position_cache()
+        if self.position_cache is None:
+            return None
+        move = self.position_cache.lookup(self._get_cache_rules(), self.marker_places)
+        if move is not None and not self.quiet:
+            print(f'Cached move: {move}')
+        return move
+
+    def _get_cache_rules(self) -> str:
+        """
+        Describe the rules and search settings which affect the AI move, so that moves searched
+        with other settings are not mixed up in a shared cache
+        :return: string
+        """
+        search_mode = self.search_mode
+        if search_mode in ('alphabeta', 'minimax') and self.grid_width > self.ai_max_grid and not self.think_ms:
+            search_mode = 'mcts'
+        # searches for X run on a board with swapped markers, kept apart from searches for O
+        return (f'{self.grid_width}x{self.grid_width} win={self.win_length} ai={self._ai_marker} '
+                f'search={search_mode} depth={self.max_depth} eval={self.settings.evaluation} think_ms={self.think_ms} '
+                f'playouts={self.playouts}')
+
+    def _minimax_algo_score(self, depth: int, ai_turn: bool, last_move: tuple = None) -> float:
         """
         Return best score current move would yield down the line using minimax algorith
         :param depth: current depth
         :param ai_turn: is AI in turn or not
+        :param last_move: (x, y, marker) of the move leading to this position
         :return: best score as float
         """
-        if self._check_win_condition_impl('X'):
-            return float(-100/depth)
-        elif self._check_win_condition_impl('O'):
-            return float(100/depth)
-        elif self._is_table_full():
-            return 0
-        elif depth > 6:
-            return 0
+        terminal_score = self._get_terminal_score(depth, last_move)
+        if self.stats is not None:
+            self.stats.add_node(depth, terminal_score is not None)
+        if terminal_score is not None:
+            return terminal_score
 
         # change turn for next round
         ai_turn = not ai_turn
@@ -306,20 +757,435 @@ class TicTacToe:
         for n in range(self.grid_width):
             for m in range(self.grid_width):
                 if self._is_allowed_move([n, m]):
-                    self.marker_places[n][m] = 'O' if ai_turn else 'X'
-                    ai_score = self._minimax_algo_score(depth + 1, ai_turn)
-                    self.marker_places[n][m] = self.placeholder
+                    marker = 'O' if ai_turn else 'X'
+                    self._place_marker(n, m, marker)
+                    ai_score = self._minimax_algo_score(depth + 1, ai_turn, (n, m, marker))
+                    self._remove_marker(n, m)
+                    if self._trace_file is not None:
+                        self._trace_position(depth + 1, (n, m, marker), ai_score)
                     scores.append((ai_score, (n, m)))
         return scores
 
+    def _alphabeta_algo_score(self, depth: int, ai_turn: bool, alpha: float, beta: float,
+                              last_move: tuple = None) -> float:
+        """
+        Return best score current move would yield down the line using minimax algorithm with
+        alpha-beta pruning. Branches that cannot change the result are left unexplored
+        :param depth: current depth
+        :param ai_turn: is AI in turn or not
+        :param alpha: score AI is already guaranteed
+        :param beta: score opponent is already guaranteed
+        :param last_move: (x, y, marker) of the move leading to this position
+        :return: best score as float, or a bound of it when branch was pruned
+        """
+        terminal_score = self._get_terminal_score(depth, last_move)
+        if self.stats is not None:
+            self.stats.add_node(depth, terminal_score is not None)
+        if terminal_score is not None:
+            return terminal_score
+
+        if self._deadline is not None and perf_counter() > self._deadline:
+            self._timed_out = True
+        if self._timed_out:
+            return 0
+
+        # positions reached earlier through another move order, or on previous turns
+        remaining_depth = self.max_depth - depth
+        board_hash, symmetry = self._hasher.get_canonical(self._board_hashes)
+        entry = self.transposition_table.get(board_hash)
+        if self.stats is not None:
+            self.stats.add_cache_probe(entry is not None)
+        table_move = None
+        if entry is not None:
+            table_score, table_depth, bound, table_move = entry
+            table_move = self._hasher.restore_move(table_move, symmetry)
+            if table_depth >= remaining_depth:
+                table_score = self._score_from_table(table_score, depth)
+                if bound == EXACT \
+                        or (bound == LOWER_BOUND and table_score >= beta) \
+                        or (bound == UPPER_BOUND and table_score <= alpha):
+                    if table_depth < self._solved_depth:
+                        self._horizon_hit = True
+                    if self.stats is not None:
+                        self.stats.cache_cutoffs += 1
+                    return table_score
+
+        # horizon flag tells if score of this subtree depends on the depth limit
+        parent_horizon_hit = self._horizon_hit
+        self._horizon_hit = False
+        original_alpha, original_beta = alpha, beta
+
+        # change turn for next round
+        ai_turn = not ai_turn
+        marker = 'O' if ai_turn else 'X'
+        best_score = -inf if ai_turn else inf
+        best_move = None
+        for n, m in self._get_ordered_moves(ai_turn, table_move):
+            self._place_marker(n, m, marker)
+            score = self._alphabeta_algo_score(depth + 1, ai_turn, alpha, beta, (n, m, marker))
+            self._remove_marker(n, m)
+            if self._trace_file is not None:
+                self._trace_position(depth + 1, (n, m, marker), score, alpha, beta)
+            if ai_turn and score > best_score or not ai_turn and score < best_score:
+                best_score, best_move = score, (n, m)
+            if ai_turn:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.cutoffs += 1
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= original_beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        table_depth = remaining_depth if self._horizon_hit else self._solved_depth
+        if not self._timed_out:
+            self.transposition_table.store(board_hash, self._score_to_table(best_score, depth), table_depth,
+                                           bound, self._hasher.transform_move(best_move, symmetry))
+        self._horizon_hit = self._horizon_hit or parent_horizon_hit
+        return best_score
+
+    def _alphabeta_search_impl(self, depth: int, ai_turn: bool, moves: list = None) -> list:
+        """
+        Score all moves at the root of alpha-beta search. Moves scoring equal to the best one get
+        their exact score, so random tie-breaking between them works like with minimax
+        :param depth: current depth
+        :param ai_turn: is AI in turn or not
+        :param moves: moves in the order to search them, by default ordered by _get_ordered_moves
+        :return: list of (score, move) tuples
+        """
+        scores = list()
+        best_score = -inf if ai_turn else inf
+        marker = 'O' if ai_turn else 'X'
+        for moves in self._group_symmetric_moves(moves or self._get_ordered_moves(ai_turn), marker):
+            # keep window open just below the best score to get exact scores for ties
+            if ai_turn:
+                alpha, beta = best_score - self._tie_margin, inf
+            else:
+                alpha, beta = -inf, best_score + self._tie_margin
+            n, m = moves[0]
+            self._place_marker(n, m, marker)
+            score = self._alphabeta_algo_score(depth + 1, ai_turn, alpha, beta, (n, m, marker))
+            self._remove_marker(n, m)
+            if self._trace_file is not None:
+                self._trace_position(depth + 1, (n, m, marker), score, alpha, beta)
+            if self._timed_out:
+                break
+            best_score = max(best_score, score) if ai_turn else min(best_score, score)
+            scores.extend((score, move) for move in moves)
+        return scores
+
+    def _iterative_deepening_search(self) -> list:
+        """
+        Run alpha-beta search one move deeper at a time until the time budget runs out, the depth
+        limit is reached or the game tree is searched to the end. Each iteration tries moves in the order of previous
+        iteration's scores, and transposition table gives the previous best line below the root
+        :return: list of (score, move) tuples from the deepest completed iteration
+        """
+        max_depth = self.max_depth
+        deadline = perf_counter() + self.think_ms / 1000
+        scores = None
+        moves = None
+        try:
+            # first iteration is always completed to have some move to play
+            for depth_limit in range(1, min(max_depth, self.grid_width * self.grid_width) + 1):
+                self.max_depth = depth_limit
+                self._horizon_hit = False
+                iteration_start = perf_counter()
+                iteration_scores = self._alphabeta_search_impl(1, True, moves)
+                if self.stats is not None:
+                    self.stats.iteration_times[depth_limit] = perf_counter() - iteration_start
+                if self._timed_out:
+                    break
+                scores = iteration_scores
+                log.debug('depth %d: %s (%d positions)', depth_limit, max(scores), self.nodes_visited)
+                if not self._horizon_hit:
+                    break
+                moves = [move for _, move in sorted(scores, key=lambda score: score[0], reverse=True)]
+                if perf_counter() > deadline:
+                    break
+                self._deadline = deadline
+        finally:
+            self.max_depth = max_depth
+            self._deadline = None
+            self._timed_out = False
+        return scores
+
+    def _parallel_search_impl(self) -> list:
+        """
+        Score root moves in a pool of worker processes. The most promising move is searched here
+        first, and its score bounds the alpha-beta window of the workers, which search the rest
+        of the moves on their own copies of the board starting from a copy of this search's
+        transposition table. Scores and statistics are merged back here, while positions the
+        workers add to their tables are thrown away
+        :return: list of (score, move) tuples
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+
+        groups = self._group_symmetric_moves(self._get_ordered_moves(True), 'O')
+        # without the score of a good move first, workers would search everything with a full window
+        scores, _, _ = _evaluate_root_moves(self, [groups[0][0]])
+        group_scores = {move: score for score, move in scores}
+        alpha = scores[0][0] - self._tie_margin if self.search_mode != 'minimax' else -inf
+        # deal moves in search order, so that every worker gets some of the promising ones
+        shares = [[group[0] for group in groups[1 + n::self.workers]] for n in range(self.workers)]
+        futures = [self._executor.submit(_evaluate_root_moves, self, share, alpha, self.transposition_table)
+                   for share in shares if share]
+
+        for future in futures:
+            scores, nodes_visited, stats = future.result()
+            self.nodes_visited += nodes_visited
+            if stats is not None:
+                self.stats.merge(stats)
+            group_scores.update((move, score) for score, move in scores)
+        return [(group_scores[group[0]], move) for group in groups for move in group]
+
+    def _trace_position(self, depth: int, last_move: tuple, score: float, alpha: float = None,
+                        beta: float = None):
+        """
+        Write a scored position to the trace file. Positions are written after their children, so
+        the parent of a position is the next one written with depth one less
+        :param depth: depth of the position
+        :param last_move: (x, y, marker) of the move leading to the position
+        :param score: score of the position
+        :param alpha: lower end of the alpha-beta window the position was searched with
+        :param beta: upper end of the alpha-beta window
+        :return: None
+        """
+        record = {'depth': depth, 'move': last_move[:2], 'marker': last_move[2], 'score': score}
+        if alpha is not None:
+            record.update(alpha=alpha, beta=beta)
+        self._trace_file.write(json.dumps(record) + '\n')
+
+    def _group_symmetric_moves(self, moves: list, marker: str) -> list:
+        """
+        Group moves leading to positions which are rotations or mirror images of each other,
+        so that only one move of each group needs to be searched
+        :param moves: list of (x, y) tuples
+        :param marker: player's marker (X or O)
+        :return: list of lists of equivalent moves, in order of the given moves
+        """
+        groups = dict()
+        for n, m in moves:
+            self._place_marker(n, m, marker)
+            groups.setdefault(min(self._board_hashes), list()).append((n, m))
+            self._remove_marker(n, m)
+        return list(groups.values())
+
+    def _get_ordered_moves(self, ai_turn: bool, first_move: tuple = None) -> list:
+        """
+        Get free cells in the order alpha-beta search should try them: winning moves first,
+        then moves blocking opponent's win, and the rest from the center of the board outwards
+        :param ai_turn: is AI in turn or not
+        :param first_move: move to try before all others, like the best move found earlier
+        :return: list of (x, y) tuples
+        """
+        own, opponent = ('O', 'X') if ai_turn else ('X', 'O')
+        center = (self.grid_width - 1) / 2
+        moves = list()
+        for n in range(self.grid_width):
+            for m in range(self.grid_width):
+                if self.marker_places[n][m].strip():
+                    continue
+                if self._is_winning_cell(n, m, own):
+                    threat = 0
+                elif self._is_winning_cell(n, m, opponent):
+                    threat = 1
+                else:
+                    threat = 2
+                if (n, m) == first_move:
+                    threat = -1
+                moves.append((threat, abs(n - center) + abs(m - center), (n, m)))
+        moves.sort()
+        return [move for _, _, move in moves]
+
+    def _is_winning_cell(self, x: int, y: int, marker: str) -> bool:
+        """
+        Check if placing marker to given free cell would complete any line for the player
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker (X or O)
+        :return: boolean if move wins the game
+        """
+        if self.bitboard is not None:
+            return self.bitboard.is_winning_move(self.bitboard.get_index(x, y), marker)
+        counts = self._line_counts[marker]
+        return any(counts[index] == self._line_length - 1 for index in self._cell_lines[(x, y)])
+
+    def _is_line_completed(self, x: int, y: int, marker: str) -> bool:
+        """
+        Check if marker in given cell is part of a line claimed by the player. Only the lines
+        through the cell are checked, so this costs the same regardless of grid size
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker (X or O)
+        :return: boolean if player has won
+        """
+        if self.bitboard is not None:
+            return self.bitboard.is_winning_move(self.bitboard.get_index(x, y), marker)
+        counts = self._line_counts[marker]
+        return any(counts[index] == self._line_length for index in self._cell_lines[(x, y)])
+
+    def _place_marker(self, x: int, y: int, marker: str):
+        """
+        Place marker on the board during search, keeping position hash up to date
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker (X or O)
+        :return: None
+        """
+        self.marker_places[x][y] = marker
+        self._move_count += 1
+        if self.bitboard is not None:
+            self.bitboard.place(self.bitboard.get_index(x, y), marker)
+        else:
+            counts = self._line_counts[marker]
+            for index in self._cell_lines[(x, y)]:
+                counts[index] += 1
+        if self.evaluator is not None:
+            self.evaluator.place(x, y, marker)
+        keys = self._hasher.get_keys(x, y, marker)
+        self._board_hashes = [board_hash ^ key for board_hash, key in zip(self._board_hashes, keys)]
+
+    def _remove_marker(self, x: int, y: int):
+        """
+        Take back marker placed during search
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :return: None
+        """
+        marker = self.marker_places[x][y]
+        keys = self._hasher.get_keys(x, y, marker)
+        self._board_hashes = [board_hash ^ key for board_hash, key in zip(self._board_hashes, keys)]
+        self.marker_places[x][y] = self.placeholder
+        self._move_count -= 1
+        if self.bitboard is not None:
+            self.bitboard.remove(self.bitboard.get_index(x, y))
+        else:
+            counts = self._line_counts[marker]
+            for index in self._cell_lines[(x, y)]:
+                counts[index] -= 1
+        if self.evaluator is not None:
+            self.evaluator.remove(x, y, marker)
+
+    def _sync_search_state(self):
+        """
+        Rebuild position hashes, line counters and bitboard from markers on the board, in case
+        the board has been changed without _enter_move
+        :return: None
+        """
+        self._board_hashes = self._hasher.get_hashes(self.marker_places)
+        self._free_cells = [(x, y) for x, row in enumerate(self.marker_places)
+                            for y, marker in enumerate(row) if not marker.strip()]
+        self._free_cell_index = {cell: position for position, cell in enumerate(self._free_cells)}
+        self._move_count = 0
+        for counts in self._line_counts.values():
+            counts[:] = [0] * len(counts)
+        for x, row in enumerate(self.marker_places):
+            for y, marker in enumerate(row):
+                if marker in self._line_counts:
+                    self._move_count += 1
+                    for index in self._cell_lines[(x, y)]:
+                        self._line_counts[marker][index] += 1
+        if self.bitboard is not None:
+            self.bitboard = BitBoard.from_marker_places(self.marker_places, self.win_length)
+        if self.evaluator is not None:
+            self.evaluator.reset(self.marker_places)
+
+    @property
+    def _solved_depth(self) -> int:
+        """
+        Depth stored for positions searched to the end, valid however deep search would go
+        :return: number of cells on the board
+        """
+        return self.grid_width * self.grid_width
+
+    @staticmethod
+    def _score_to_table(score: float, depth: int) -> float:
+        """
+        Convert score to be independent of the depth position was found in, so that it can be
+        reused when the same position shows up at another depth or on a later turn
+        :param score: score from search
+        :param depth: depth of the position
+        :return: signed number of moves from the position to a win, or heuristic score as is
+        """
+        if abs(score) <= HEURISTIC_LIMIT:
+            return score
+        return copysign(round(100 / abs(score)) - depth, score)
+
+    @staticmethod
+    def _score_from_table(score: float, depth: int) -> float:
+        """
+        Convert score stored to transposition table back to a search score at given depth
+        :param score: stored score
+        :param depth: depth of the position
+        :return: score as float
+        """
+        # wins are stored as at least one move away, anything smaller is a heuristic score
+        if abs(score) < 1:
+            return score
+        return copysign(100 / (abs(score) + depth), score)
+
     def _get_best_move_coordinates(self):
         """
         Get best coordinates to
         :return:
         """
-        scores = self._minimax_search_impl(1, True)
+        self.nodes_visited = 0
+        self._sync_search_state()
+        if self.search_mode == 'threat':
+            board = self.bitboard or BitBoard.from_marker_places(self.marker_places, self.win_length)
+            search = ThreatSpaceSearch(board)
+            move = board.get_coordinates(search.get_move('O'))
+            self.nodes_visited = search.nodes_visited
+            if not self.quiet:
+                print(f'Best move: {move} ({self.nodes_visited} positions)')
+            return move
+        if self.search_mode == 'mcts' or (self.grid_width > self.ai_max_grid and not self.think_ms):
+            return self._mcts_search_impl()
+        self.stats = SearchStats() if self.settings.stats else None
+        if self._trace_file is not None:
+            self._trace_file.write(json.dumps({'board': self.marker_places, 'search': self.search_mode,
+                                               'max_depth': self.max_depth}) + '\n')
+        search_start = perf_counter()
+        if self.workers > 1 and not self.think_ms:
+            scores = self._parallel_search_impl()
+        elif self.search_mode == 'minimax':
+            scores = self._minimax_search_impl(1, True)
+        elif self.think_ms:
+            scores = self._iterative_deepening_search()
+        else:
+            scores = self._alphabeta_search_impl(1, True)
         score, move = self._get_best_score_move_from_array(scores, True)
-        print(f'Best move: {move} with score {score}')
+        if self.stats is not None:
+            self.stats.elapsed = perf_counter() - search_start
+        if self._trace_file is not None:
+            self._trace_file.write(json.dumps({'best_move': move, 'score': score}) + '\n')
+            self._trace_file.flush()
+        if not self.quiet:
+            print(f'Best move: {move} with score {score} ({self.nodes_visited} positions)')
+            if self.stats is not None:
+                print(self.stats)
+        return move
+
+    def _mcts_search_impl(self) -> tuple:
+        """
+        Monte Carlo tree search for boards too large for minimax, keeping the tree between turns
+        :return: tuple of coordinates
+        """
+        if self._mcts is None:
+            self._mcts = MonteCarloTreeSearch(self.playouts, self.think_ms)
+        board = self.bitboard or BitBoard.from_marker_places(self.marker_places, self.win_length)
+        move = board.get_coordinates(self._mcts.get_move(board, 'O'))
+        self.nodes_visited = self._mcts.nodes_visited
+        if not self.quiet:
+            print(f'Best move: {move} ({self.nodes_visited} playouts)')
         return move
 
     @staticmethod
@@ -352,6 +1218,9 @@ class TicTacToe:
         making game ending with stalemate result
         :return: boolean of stalemate condition
         """
+        if self.bitboard is not None:
+            return self.bitboard.is_full()
+
         # flatten table and check if any empty cells are left
         all_cells = []
         [all_cells.extend(el) for el in self.marker_places]
@@ -373,5 +1242,9 @@ class TicTacToe:
 
 
 if __name__ == '__main__':
-    ttt_game = TicTacToe()
+    try:
+        ttt_game = TicTacToe(GameSettings.from_arguments())
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
     ttt_game.main()
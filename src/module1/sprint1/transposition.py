@@ -0,0 +1,210 @@
+"""
+Transposition table for TicTacToe AI search, with Zobrist hashed board positions. Positions which
+are rotations or mirror images of each other share the same canonical hash
+
+:author: @mjuuti
+"""
+import random
+from collections import OrderedDict
+
+# bound types of stored scores
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+def get_symmetries(grid_width: int) -> list:
+    """
+    Get the 8 symmetries of a square board (rotations and mirror images) as cell permutations
+    :param grid_width: width (and height) of the board
+    :return: list of lists where item at index x * grid_width + y is the index cell (x, y) maps to
+    """
+    w = grid_width - 1
+    transforms = [
+        lambda x, y: (x, y),
+        lambda x, y: (y, w - x),
+        lambda x, y: (w - x, w - y),
+        lambda x, y: (w - y, x),
+        lambda x, y: (x, w - y),
+        lambda x, y: (w - x, y),
+        lambda x, y: (y, x),
+        lambda x, y: (w - y, w - x),
+    ]
+    symmetries = list()
+    for transform in transforms:
+        permutation = list()
+        for x in range(grid_width):
+            for y in range(grid_width):
+                tx, ty = transform(x, y)
+                permutation.append(tx * grid_width + ty)
+        symmetries.append(permutation)
+    return symmetries
+
+
+class ZobristHasher:
+    """
+    Zobrist hash keys for board cells. Hash of a position is XOR of the keys of all occupied cells,
+    so it can be updated with a single XOR whenever a marker is placed or removed. A hash is kept
+    for each symmetry of the board, and the smallest of them is the canonical hash
+    """
+
+    grid_width = None  # type: int
+    keys = None  # type: dict
+    symmetries = None  # type: list
+    symmetry_keys = None  # type: dict
+    _inverses = None  # type: list
+
+    def __init__(self, grid_width: int):
+        # fixed seed gives same hashes between runs and processes
+        rng = random.Random(grid_width)
+        self.grid_width = grid_width
+        self.keys = {marker: [rng.getrandbits(64) for _ in range(grid_width * grid_width)]
+                     for marker in 'XO'}
+
+        self.symmetries = get_symmetries(grid_width)
+        self._inverses = list()
+        for permutation in self.symmetries:
+            inverse = [0] * len(permutation)
+            for index, target in enumerate(permutation):
+                inverse[target] = index
+            self._inverses.append(inverse)
+
+        # keys of a cell in each symmetric image of the board
+        self.symmetry_keys = {
+            marker: [tuple(keys[permutation[index]] for permutation in self.symmetries)
+                     for index in range(grid_width * grid_width)]
+            for marker, keys in self.keys.items()
+        }
+
+    def get_key(self, x: int, y: int, marker: str) -> int:
+        """
+        Get hash key for a marker in given cell
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker (X or O)
+        :return: 64-bit integer key
+        """
+        return self.keys[marker][x * self.grid_width + y]
+
+    def get_hash(self, marker_places: list) -> int:
+        """
+        Calculate hash for a whole board from scratch
+        :param marker_places: board as list of lists of markers
+        :return: 64-bit integer hash
+        """
+        board_hash = 0
+        for x, row in enumerate(marker_places):
+            for y, marker in enumerate(row):
+                if marker in self.keys:
+                    board_hash ^= self.get_key(x, y, marker)
+        return board_hash
+
+    def get_keys(self, x: int, y: int, marker: str) -> tuple:
+        """
+        Get hash keys for a marker in given cell, one for each symmetry of the board
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :param marker: player's marker (X or O)
+        :return: tuple of 8 integer keys
+        """
+        return self.symmetry_keys[marker][x * self.grid_width + y]
+
+    def get_hashes(self, marker_places: list) -> list:
+        """
+        Calculate hashes of a whole board from scratch, one for each symmetry of the board
+        :param marker_places: board as list of lists of markers
+        :return: list of 8 integer hashes
+        """
+        board_hashes = [0] * len(self.symmetries)
+        for x, row in enumerate(marker_places):
+            for y, marker in enumerate(row):
+                if marker in self.keys:
+                    keys = self.get_keys(x, y, marker)
+                    board_hashes = [board_hash ^ key for board_hash, key in zip(board_hashes, keys)]
+        return board_hashes
+
+    @staticmethod
+    def get_canonical(board_hashes: list) -> tuple:
+        """
+        Get canonical hash, shared by all symmetric positions, and the symmetry it was taken from
+        :param board_hashes: hashes of a position from get_hashes
+        :return: tuple(canonical hash, symmetry index)
+        """
+        board_hash = min(board_hashes)
+        return board_hash, board_hashes.index(board_hash)
+
+    def transform_move(self, move: tuple, symmetry: int) -> tuple:
+        """
+        Map move on the board to the same move on the canonical board
+        :param move: (x, y) tuple
+        :param symmetry: symmetry index from get_canonical
+        :return: (x, y) tuple
+        """
+        if move is None:
+            return None
+        return divmod(self.symmetries[symmetry][move[0] * self.grid_width + move[1]], self.grid_width)
+
+    def restore_move(self, move: tuple, symmetry: int) -> tuple:
+        """
+        Map move on the canonical board back to the board, reverse of transform_move
+        :param move: (x, y) tuple
+        :param symmetry: symmetry index from get_canonical
+        :return: (x, y) tuple
+        """
+        if move is None:
+            return None
+        return divmod(self._inverses[symmetry][move[0] * self.grid_width + move[1]], self.grid_width)
+
+
+class TranspositionTable:
+    """
+    Bounded cache of searched positions. Least recently used entries are evicted when table is full
+    """
+
+    max_size = None  # type: int
+    hits = 0
+    _entries = None  # type: OrderedDict
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: int):
+        """
+        Get stored entry for a position
+        :param key: position hash
+        :return: tuple(score, depth, bound, move) or None if position is not stored
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def store(self, key: int, score: float, depth: int, bound: int, move: tuple):
+        """
+        Store search result for a position, evicting least recently used entry if table is full
+        :param key: position hash
+        :param score: score of the position
+        :param depth: remaining search depth the score is valid for
+        :param bound: EXACT, LOWER_BOUND or UPPER_BOUND
+        :param move: best move found in the position
+        :return: None
+        """
+        if not self.max_size:
+            return
+        self._entries[key] = (score, depth, bound, move)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all stored positions
+        :return: None
+        """
+        self._entries.clear()
+        self.hits = 0